@@ -8,14 +8,34 @@ Only adds base64 screenshot encoding
 import json
 import sys
 import os
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 import pyautogui
 import subprocess
 from PIL import ImageGrab, Image
 import base64
+import binascii
 import io
+import re
+import traceback
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import tempfile
+import shutil
+import atexit
+import itertools
+import threading
+import functools
+import queue
+import time
+import uuid
+import ctypes
+from ctypes import wintypes
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
 
 # Windows-specific flag to hide console windows
 CREATE_NO_WINDOW = 0x08000000
@@ -23,6 +43,7 @@ CREATE_NO_WINDOW = 0x08000000
 # Configuration
 PORT = int(os.environ.get('AGENT_PORT', 8888))
 API_KEY = os.environ['ENCRYPTION_KEY']  # Must be set in .env file
+SCREENSHOT_FORMAT = os.environ.get('SCREENSHOT_FORMAT', 'png').lower()  # png, jpeg or webp
 
 print(f'Starting Windows Agent (Pure API Service Mode) on port {PORT}...')
 print(f'API Key: ...{API_KEY[-8:]}')
@@ -32,7 +53,528 @@ print('[MODE] NO local generation - all data from API service')
 pyautogui.FAILSAFE = True
 pyautogui.PAUSE = 0.1
 
+# Trailing whitespace and blank lines after a line-continuation backslash
+LINE_CONTINUATION = re.compile(r'\\\s*?(\n(?=[^\n]*\S)|\Z)')
+
+# Scratch root for scripts that ship helpers, created once per agent run
+SCRIPT_ROOT = tempfile.mkdtemp(prefix='mcp_scripts_')
+SCRIPT_COUNTER = itertools.count()
+atexit.register(shutil.rmtree, SCRIPT_ROOT, ignore_errors=True)
+
+# Decrypted scripts are sent to the child as UTF-8 and it answers in UTF-8
+SCRIPT_ENV = {**os.environ, 'PYTHONIOENCODING': 'utf-8'}
+
+# Scripts that leave process-wide state behind on every run (screenshot.py ends with os._exit and
+# sets sys.coinit_flags, OMP_THREAD_LIMIT and TESSDATA_PREFIX) would retire a warm worker each
+# time, so they go straight to a fresh interpreter
+COLD_SCRIPTS = {'screenshot.py'}
+
+def grab_screen():
+    """Capture the primary monitor as an RGB image (mss BitBlt/GetDIBits, ImageGrab fallback)"""
+    if not MSS_AVAILABLE:
+        return ImageGrab.grab()
+    # Every request runs on a fresh handler thread, so nothing per-thread would be reused;
+    # the with-block releases the DCs and bitmap mss holds (it has no __del__)
+    with mss.mss() as sct:
+        shot = sct.grab(sct.monitors[1])
+    return Image.frombytes('RGB', shot.size, shot.bgra, 'raw', 'BGRX')
+
+# Pillow encoder settings per screenshot format (JPEG/WebP are 5-20x smaller than PNG for screen content)
+IMAGE_FORMATS = {
+    'png': ('PNG', {}),
+    'jpeg': ('JPEG', {'quality': 85}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+}
+
+class Base64Sink(io.RawIOBase):
+    """Write-only file that base64-encodes bytes as the image encoder produces them"""
+    
+    def __init__(self):
+        super().__init__()
+        self.buf = bytearray()
+        self.pending = b''
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        view = memoryview(data).cast('B')
+        size = len(view)
+        
+        # base64 works on 3-byte groups, top up the remainder carried over from the last write first
+        if self.pending:
+            take = 3 - len(self.pending)
+            self.pending += view[:take].tobytes()
+            view = view[take:]
+            if len(self.pending) < 3:
+                return size
+            self.buf += binascii.b2a_base64(self.pending, newline=False)
+        
+        # Encode straight from the encoder's buffer, no intermediate copy
+        cut = len(view) - len(view) % 3
+        self.buf += binascii.b2a_base64(view[:cut], newline=False)
+        self.pending = view[cut:].tobytes()
+        return size
+    
+    def getvalue(self):
+        """Finish the encoding and hand back the buffer itself rather than a copy"""
+        self.buf += binascii.b2a_base64(self.pending, newline=False)
+        self.pending = b''
+        return self.buf
+
+def decode_bytes(value):
+    """json.dumps fallback for base64 screenshots nested in batch results"""
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def as_text(output):
+    """Script output as str, decoding the bytes a binary-mode subprocess returns"""
+    if isinstance(output, bytes):
+        return output.decode('utf-8', errors='replace')
+    return output
+
+def sniff_format(raw):
+    """Image format from the file's magic bytes, None when it isn't PNG/JPEG/WebP"""
+    if raw[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png'
+    if raw[:3] == b'\xff\xd8\xff':
+        return 'jpeg'
+    if raw[:4] == b'RIFF' and raw[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+def png_fast_compressed(raw):
+    """True for a PNG whose zlib stream declares a fast (level 1-5) compression, e.g. screenshot.py's saves"""
+    idat = raw.find(b'IDAT')
+    # FLEVEL, the top two bits of the zlib header's FLG byte: 0 fastest, 1 fast, 2 default, 3 maximum
+    return idat != -1 and len(raw) > idat + 5 and raw[idat + 5] >> 6 < 2
+
+def encode_image(img, image_format):
+    """Encode a PIL image to base64 bytes, returns (base64, format actually used)"""
+    if image_format not in IMAGE_FORMATS:
+        image_format = 'png'
+    pil_format, options = IMAGE_FORMATS[image_format]
+    if pil_format != 'PNG' and img.mode != 'RGB':
+        img = img.convert('RGB')
+    sink = Base64Sink()
+    img.save(sink, format=pil_format, **options)
+    return sink.getvalue(), image_format
+
+# Shared pool for decrypting helper scripts (AESGCM releases the GIL inside OpenSSL)
+DECRYPT_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix='decrypt')
+
+@functools.lru_cache(maxsize=32)
+def get_aesgcm(key):
+    """One AESGCM per key for the life of the agent, so repeat keys skip key expansion and context setup"""
+    return AESGCM(key)
+
+def decode_field(value, encoding):
+    """Binary payload field from the API service: base64 when the payload says so, hex for older services"""
+    return base64.b64decode(value) if encoding == 'base64' else bytes.fromhex(value)
+
+def decrypt_helper(aesgcm, helper, encoding):
+    """Decrypt one helper script and normalize its line endings"""
+    helper_encrypted = decode_field(helper['encryptedContent'], encoding)
+    helper_iv = decode_field(helper['iv'], encoding)
+    helper_auth_tag = decode_field(helper['authTag'], encoding)
+    helper_decrypted = aesgcm.decrypt(helper_iv, helper_encrypted + helper_auth_tag, None)
+    helper_content = helper_decrypted.decode('utf-8')
+    return helper_content.replace('\r\n', '\n').replace('\r', '\n')
+
+def pump_lines(stream):
+    """Read a child's output on a thread so callers can wait with a timeout; None marks EOF"""
+    lines = queue.Queue()
+    def pump():
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+    threading.Thread(target=pump, daemon=True).start()
+    return lines
+
+# One-line wrapper sent to the PowerShell host: decodes the command, runs it, and prints
+# stdout, an error marker, the error records, then the marker with the exit code.
+# The exit code follows powershell -Command: $LASTEXITCODE of a failing native command, else 1 when
+# the command failed ($? false or a terminating error). The location and environment are saved
+# before the command and put back afterwards so one call cannot leak state into the next.
+PS_WRAPPER = (
+    "& {{ $__ps_cmd = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String('{script}')); "
+    "$__ps_loc = (Get-Location).Path; $__ps_env = @{{}}; "
+    "Get-ChildItem Env: | ForEach-Object {{ $__ps_env[$_.Name] = $_.Value }}; "
+    "$global:LASTEXITCODE = 0; "
+    "try {{ $__ps_out = @(Invoke-Expression $__ps_cmd 2>&1); $__ps_ok = $? }} catch {{ $__ps_out = @($_); $__ps_ok = $false }}; "
+    "$__ps_code = $global:LASTEXITCODE; "
+    "Set-Location -LiteralPath $__ps_loc -ErrorAction SilentlyContinue; "
+    "@(Get-ChildItem Env:) | Where-Object {{ -not $__ps_env.ContainsKey($_.Name) }} | ForEach-Object {{ Remove-Item -LiteralPath ('Env:' + $_.Name) }}; "
+    "foreach ($__ps_key in $__ps_env.Keys) {{ [Environment]::SetEnvironmentVariable($__ps_key, $__ps_env[$__ps_key]) }}; "
+    "$__ps_out | Where-Object {{ $_ -isnot [Management.Automation.ErrorRecord] }} | Out-String -Stream; "
+    "'{marker}ERR'; "
+    "$__ps_out | Where-Object {{ $_ -is [Management.Automation.ErrorRecord] }} | Out-String -Stream; "
+    "if ($__ps_code) {{ '{marker}' + [int]$__ps_code }} else {{ '{marker}' + [int](-not $__ps_ok) }} }}"
+)
+
+class PowerShellHost:
+    """Long-lived powershell.exe fed one command at a time over stdin, so calls skip the 300-800 ms startup"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.proc = None
+        self.lines = None
+        self.marker = f'<<<{uuid.uuid4().hex}>>>'
+    
+    def start(self):
+        self.proc = subprocess.Popen(
+            ['powershell', '-NoProfile', '-NonInteractive', '-Command', '-'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            encoding='utf-8',
+            errors='replace',
+            creationflags=CREATE_NO_WINDOW
+        )
+        self.proc.stdin.write('[Console]::OutputEncoding = [Text.Encoding]::UTF8; $ProgressPreference = "SilentlyContinue"\n')
+        self.proc.stdin.flush()
+        
+        self.lines = pump_lines(self.proc.stdout)
+        print('[POWERSHELL] Started persistent host')
+    
+    def stop(self):
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc = None
+    
+    def run(self, command, timeout=30):
+        """Run a command, returns a CompletedProcess like subprocess.run would"""
+        with self.lock:
+            try:
+                if self.proc is None or self.proc.poll() is not None:
+                    self.start()
+                script = base64.b64encode(command.encode('utf-8')).decode()
+                self.proc.stdin.write(PS_WRAPPER.format(script=script, marker=self.marker) + '\n')
+                self.proc.stdin.flush()
+            except OSError as e:
+                # Host could not be started or died under us - run this one the old way
+                print(f'[POWERSHELL] Persistent host unavailable ({e}), spawning powershell')
+                self.stop()
+                return subprocess.run(
+                    ['powershell', '-Command', command],
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout,
+                    creationflags=CREATE_NO_WINDOW
+                )
+            
+            stdout, stderr = [], []
+            target = stdout
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    line = self.lines.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    self.stop()
+                    raise subprocess.TimeoutExpired(command, timeout)
+                
+                if line is None:
+                    # The command exited the host (e.g. `exit 3`), report its exit code
+                    returncode = self.proc.wait()
+                    self.proc = None
+                    return subprocess.CompletedProcess(command, returncode, ''.join(stdout), ''.join(stderr))
+                
+                if line.startswith(self.marker):
+                    status = line[len(self.marker):].strip()
+                    if status == 'ERR':
+                        target = stderr
+                        continue
+                    return subprocess.CompletedProcess(command, int(status), ''.join(stdout), ''.join(stderr))
+                
+                target.append(line)
+
+POWERSHELL = PowerShellHost()
+atexit.register(POWERSHELL.stop)
+
+# Worker loop run by warm interpreters: one JSON request per line in; out goes a JSON header line
+# followed by the script's stdout as a raw block of header['stdout'] bytes, so the agent parses the
+# script's JSON once instead of unwrapping it from a JSON string first.
+# The protocol gets a private copy of stdout; fd-level writes from scripts are pointed at stderr.
+# Each script runs as it would under a fresh `python script.py`: byte-backed stdout/stderr, a real
+# __file__ and its own scratch cwd. Scripts that leave process-wide state behind (os._exit, new sys
+# settings such as coinit_flags, environment changes, threads still running) retire the worker.
+SCRIPT_WORKER = r'''
+import contextlib, io, json, os, shutil, sys, tempfile, threading, traceback, types
+proto = os.fdopen(os.dup(1), 'wb')
+os.dup2(2, 1)
+sys.stdin.reconfigure(encoding='utf-8')
+for name in ('PIL.Image', 'PIL.ImageGrab', 'pytesseract', 'mss', 'pyautogui', 'numpy', 'cv2', 'ctypes'):
+    try:
+        __import__(name)
+    except Exception:
+        pass
+# Scripts that end with os._exit must not take the worker down mid-request;
+# the worker finishes the reply and then exits for real
+real_exit = os._exit
+exit_called = False
+def script_exit(code):
+    global exit_called
+    exit_called = True
+    raise SystemExit(code)
+os._exit = script_exit
+home = os.getcwd()
+# Helper modules installed so far, re-executed only when their source changes
+modules = {}
+proto.write(b'ready\n')
+proto.flush()
+for line in sys.stdin:
+    request = json.loads(line)
+    out = io.TextIOWrapper(io.BytesIO(), encoding='utf-8', write_through=True)
+    err = io.TextIOWrapper(io.BytesIO(), encoding='utf-8', errors='backslashreplace', write_through=True)
+    run_dir = tempfile.mkdtemp(prefix='mcp_run_')
+    script_path = os.path.join(run_dir, os.path.basename(request['argv'][0]))
+    with open(script_path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(request['source'])
+    sys_names, environ, sys_path = set(vars(sys)), dict(os.environ), list(sys.path)
+    threads = set(threading.enumerate())
+    code = 0
+    sys.argv = [script_path] + request['argv'][1:]
+    os.chdir(run_dir)
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        sys.stdin, stdin = io.StringIO(), sys.stdin
+        try:
+            for name, source in request.get('modules', {}).items():
+                if modules.get(name) != source:
+                    module = types.ModuleType(name)
+                    module.__file__ = name + '.py'
+                    modules.pop(name, None)
+                    exec(compile(source, module.__file__, 'exec'), module.__dict__)
+                    sys.modules[name] = module
+                    modules[name] = source
+            exec(compile(request['source'], script_path, 'exec'),
+                 {'__name__': '__main__', '__file__': script_path, '__builtins__': __builtins__})
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdin = stdin
+            out.flush()
+            err.flush()
+    os.chdir(home)
+    sys.path[:] = sys_path
+    shutil.rmtree(run_dir, ignore_errors=True)
+    retire = bool(exit_called or set(vars(sys)) - sys_names or os.environ != environ
+                  or any(thread.is_alive() for thread in set(threading.enumerate()) - threads))
+    stdout = out.buffer.getvalue()
+    proto.write(json.dumps({
+        'returncode': code,
+        'stdout': len(stdout),
+        'stderr': err.buffer.getvalue().decode('utf-8', 'replace'),
+        'retire': retire
+    }).encode('utf-8') + b'\n')
+    proto.write(stdout)
+    proto.flush()
+    if retire:
+        real_exit(0)
+'''
+
+def pump_replies(stream):
+    """Read worker replies on a thread: 'ready', then (header, stdout bytes) per script; None marks EOF"""
+    replies = queue.Queue()
+    def pump():
+        while True:
+            line = stream.readline()
+            if not line:
+                break
+            if line == b'ready\n':
+                replies.put('ready')
+                continue
+            header = json.loads(line)
+            stdout = stream.read(header['stdout'])
+            if len(stdout) < header['stdout']:
+                break
+            replies.put((header, stdout))
+        replies.put(None)
+    threading.Thread(target=pump, daemon=True).start()
+    return replies
+
+class ScriptWorker:
+    """One warm python interpreter that execs scripts in-process instead of paying startup + imports per call"""
+    
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            ['python', '-c', SCRIPT_WORKER],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=SCRIPT_ENV,
+            creationflags=CREATE_NO_WINDOW
+        )
+        self.replies = pump_replies(self.proc.stdout)
+        self.ready = False
+        # Set once a script left process-wide state behind; the worker exits after replying
+        self.retired = False
+    
+    def read_reply(self, deadline):
+        try:
+            return self.replies.get(timeout=max(0, deadline - time.monotonic()))
+        except queue.Empty:
+            return ''
+    
+    def run(self, script_content, argv, timeout, modules=None):
+        """Run a script, returns a CompletedProcess; raises TimeoutExpired (worker killed) like subprocess.run
+        
+        modules maps importable helper names to their source, installed in the worker before the script runs.
+        """
+        deadline = time.monotonic() + timeout
+        if not self.ready:
+            # First use waits for the pre-imports to finish
+            if self.read_reply(deadline) != 'ready':
+                self.kill()
+                raise subprocess.TimeoutExpired(argv, timeout)
+            self.ready = True
+        
+        request = json.dumps({'source': script_content, 'argv': argv, 'modules': modules or {}}) + '\n'
+        self.proc.stdin.write(request.encode('utf-8'))
+        self.proc.stdin.flush()
+        
+        reply = self.read_reply(deadline)
+        if reply is None:
+            # The script took the interpreter down (os._exit, crash) - report it as a failed run
+            returncode = self.proc.wait()
+            return subprocess.CompletedProcess(argv, returncode or 1, b'', 'Script worker exited unexpectedly')
+        if not reply:
+            self.kill()
+            raise subprocess.TimeoutExpired(argv, timeout)
+        
+        # stdout stays bytes, as on the subprocess path
+        header, stdout = reply
+        self.retired = header.get('retire', False)
+        return subprocess.CompletedProcess(argv, header['returncode'], stdout, header['stderr'])
+    
+    def alive(self):
+        return not self.retired and self.proc.poll() is None
+    
+    def kill(self):
+        self.proc.kill()
+
+class ScriptWorkerPool:
+    """Idle warm workers; concurrent requests spawn extra ones so scripts still run in parallel"""
+    
+    def __init__(self, max_idle=2):
+        self.lock = threading.Lock()
+        self.idle = []
+        self.max_idle = max_idle
+    
+    def acquire(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        return ScriptWorker()
+    
+    def release(self, worker):
+        with self.lock:
+            if worker.alive() and len(self.idle) < self.max_idle:
+                self.idle.append(worker)
+                return
+        worker.kill()
+        if worker.retired:
+            # Replace it right away so the next request still finds a warm interpreter
+            self.warm()
+    
+    def warm(self):
+        """Start a worker ahead of the first request"""
+        try:
+            self.release(ScriptWorker())
+        except OSError as e:
+            print(f'[WORKER] Could not start script worker: {e}')
+    
+    def run(self, script_content, argv, timeout=60, modules=None):
+        worker = self.acquire()
+        try:
+            result = worker.run(script_content, argv, timeout, modules)
+        except BaseException:
+            worker.kill()
+            raise
+        self.release(worker)
+        return result
+    
+    def stop(self):
+        with self.lock:
+            for worker in self.idle:
+                worker.kill()
+            self.idle = []
+
+SCRIPT_WORKERS = ScriptWorkerPool()
+atexit.register(SCRIPT_WORKERS.stop)
+
+# SendInput structures for typing without pyautogui's per-key round-trip
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+VK_TAB = 0x09
+VK_RETURN = 0x0D
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [('uMsg', wintypes.DWORD), ('wParamL', wintypes.WORD), ('wParamH', wintypes.WORD)]
+
+class INPUTUNION(ctypes.Union):
+    _fields_ = [('mi', MOUSEINPUT), ('ki', KEYBDINPUT), ('hi', HARDWAREINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [('type', wintypes.DWORD), ('union', INPUTUNION)]
+
+user32 = ctypes.WinDLL('user32', use_last_error=True) if sys.platform == 'win32' else None
+if user32 is not None:
+    user32.SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+    user32.SendInput.restype = wintypes.UINT
+
+def key_events(text):
+    """Down/up event pairs for text: Enter/Tab as virtual keys, everything else as UTF-16 code units"""
+    events = []
+    for char in text.replace('\r\n', '\n').replace('\r', '\n'):
+        if char in '\n\t':
+            vk = VK_RETURN if char == '\n' else VK_TAB
+            events.append(KEYBDINPUT(wVk=vk))
+            events.append(KEYBDINPUT(wVk=vk, dwFlags=KEYEVENTF_KEYUP))
+            continue
+        encoded = char.encode('utf-16-le')
+        for i in range(0, len(encoded), 2):
+            unit = int.from_bytes(encoded[i:i + 2], 'little')
+            events.append(KEYBDINPUT(wScan=unit, dwFlags=KEYEVENTF_UNICODE))
+            events.append(KEYBDINPUT(wScan=unit, dwFlags=KEYEVENTF_UNICODE | KEYEVENTF_KEYUP))
+    return events
+
+def send_text(text):
+    """Queue all key events for text with one SendInput call"""
+    events = key_events(text)
+    inputs = (INPUT * len(events))(*(INPUT(type=INPUT_KEYBOARD, union=INPUTUNION(ki=event)) for event in events))
+    sent = user32.SendInput(len(events), inputs, ctypes.sizeof(INPUT))
+    if sent != len(events):
+        raise ctypes.WinError(ctypes.get_last_error())
+
+# Read-only batch commands that may run concurrently. PowerShell is left out: every entry shares
+# the one PowerShellHost session and later entries often depend on earlier ones (cd, variables, files)
+PARALLEL_SAFE_COMMANDS = {'screenshot', 'mouse_position'}
+BATCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='batch')
+
+def is_parallel_safe(cmd):
+    return isinstance(cmd, dict) and cmd.get('command') in PARALLEL_SAFE_COMMANDS
+
 class AgentHandler(BaseHTTPRequestHandler):
+    # Responses are small writes, don't let Nagle hold them back
+    disable_nagle_algorithm = True
+    
     def do_POST(self):
         if self.path == '/execute-encrypted':
             self.handle_encrypted_execution()
@@ -61,13 +603,9 @@ class AgentHandler(BaseHTTPRequestHandler):
             # Decrypt and execute
             result = self.decrypt_and_execute(payload)
             
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
+            self.send_json(200, result)
             
         except Exception as e:
-            import traceback
             error_details = traceback.format_exc()
             print(f'[ERROR] {str(e)}')
             print(f'[TRACE] {error_details}')
@@ -80,13 +618,31 @@ class AgentHandler(BaseHTTPRequestHandler):
                 'trace': error_details
             }).encode())
     
+    def send_json(self, status, result):
+        """Send a JSON response, splicing a base64 screenshot in as raw bytes instead of running it through json.dumps"""
+        screenshot = result.get('screenshot')
+        if isinstance(screenshot, (bytes, bytearray)):
+            # base64 only uses JSON-safe characters, so the field needs no escaping
+            rest = json.dumps({k: v for k, v in result.items() if k != 'screenshot'}, default=decode_bytes).encode()
+            parts = (b'{"screenshot": "', screenshot, b'", ' + rest[1:] if len(rest) > 2 else b'"}')
+        else:
+            parts = (json.dumps(result, default=decode_bytes).encode(),)
+        
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(sum(len(part) for part in parts)))
+        self.end_headers()
+        for part in parts:
+            self.wfile.write(part)
+    
     def decrypt_and_execute(self, payload):
         """Decrypt and execute encrypted script from API service with helper scripts"""
         try:
             # Extract encryption details
-            encrypted_data = bytes.fromhex(payload.get('encryptedScript') or payload.get('encryptedCommand'))
-            iv = bytes.fromhex(payload['iv'])
-            auth_tag = bytes.fromhex(payload['authTag'])
+            encoding = payload.get('encoding', 'hex')
+            encrypted_data = decode_field(payload.get('encryptedScript') or payload.get('encryptedCommand'), encoding)
+            iv = decode_field(payload['iv'], encoding)
+            auth_tag = decode_field(payload['authTag'], encoding)
             key = bytes.fromhex(payload['decryption']['key'])
             script_type = payload.get('type', 'python')
             arguments = payload.get('arguments', [])
@@ -98,13 +654,16 @@ class AgentHandler(BaseHTTPRequestHandler):
             print(f'[DECRYPT] Helper scripts: {len(helper_scripts)}')
             
             # Decrypt using AES-256-GCM, My teacher from college once said "If you do things alone you can go fast, If you do them with guidence you can go far"
-            aesgcm = AESGCM(key)
+            # AESGCM dispatches to OpenSSL's EVP aes-256-gcm, which already uses the AES-NI/PCLMULQDQ kernels.
+            # One key schedule is shared by the main script and every helper; GCM always needs the tag, so there is no untagged retry.
+            aesgcm = get_aesgcm(key)
             
-            try:
-                decrypted = aesgcm.decrypt(iv, encrypted_data + auth_tag, None)
-            except Exception as e:
-                print(f'[DECRYPT] First attempt failed: {e}')
-                decrypted = aesgcm.decrypt(iv, encrypted_data, None)
+            # Start helper decrypts first so they overlap with the main script decrypt
+            helper_futures = []
+            if script_type != 'powershell':
+                helper_futures = [(helper, DECRYPT_POOL.submit(decrypt_helper, aesgcm, helper, encoding)) for helper in helper_scripts]
+            
+            decrypted = aesgcm.decrypt(iv, encrypted_data + auth_tag, None)
             
             print(f'[DECRYPT] Decryption successful, script length: {len(decrypted)} bytes')
             print(f'[DECRYPT] First 100 chars: {decrypted[:100]}')
@@ -112,13 +671,7 @@ class AgentHandler(BaseHTTPRequestHandler):
             if script_type == 'powershell':
                 # Execute PowerShell command
                 command = decrypted.decode('utf-8')
-                result = subprocess.run(
-                    ['powershell', '-Command', command],
-                    capture_output=True,
-                    text=True,
-                    timeout=30,
-                    creationflags=CREATE_NO_WINDOW
-                )
+                result = POWERSHELL.run(command)
                 return {
                     'success': result.returncode == 0,
                     'output': result.stdout.strip(),
@@ -132,114 +685,67 @@ class AgentHandler(BaseHTTPRequestHandler):
                 script_content = script_content.replace('\r\n', '\n')
                 script_content = script_content.replace('\r', '\n')
                 
-                # Fix line continuations by removing newlines after backslash
-                import re
-                lines = script_content.split('\n')
-                fixed_lines = []
-                i = 0
-                while i < len(lines):
-                    line = lines[i]
-                    if line.rstrip().endswith('\\'):
-                        fixed_lines.append(line.rstrip())
-                        i += 1
-                        while i < len(lines) and lines[i].strip() == '':
-                            i += 1
-                        if i < len(lines):
-                            fixed_lines[-1] += '\n' + lines[i]
-                            i += 1
-                    else:
-                        fixed_lines.append(line)
-                        i += 1
-                
-                script_content = '\n'.join(fixed_lines)
+                # Fix line continuations by removing blank lines after backslash
+                script_content = LINE_CONTINUATION.sub(r'\\\1', script_content)
                 
-                # Create temporary directory for script and helpers
-                temp_dir = tempfile.mkdtemp(prefix='mcp_script_')
-                print(f'[HELPER] Created temp directory: {temp_dir}')
+                args_str = [str(arg) for arg in arguments]
                 
-                try:
-                    # Decrypt and save helper scripts first
-                    for helper in helper_scripts:
+                if script_name not in COLD_SCRIPTS and all(helper.get('name', '').endswith('.py') for helper, _ in helper_futures):
+                    # Helpers (if any) are plain modules - a warm worker imports them in-process, no temp directory needed
+                    # A helper that fails to decrypt/decode is logged and skipped, as run_with_helpers does
+                    modules = {}
+                    for helper, future in helper_futures:
                         try:
-                            helper_name = helper['name']
-                            helper_encrypted = bytes.fromhex(helper['encryptedContent'])
-                            helper_iv = bytes.fromhex(helper['iv'])
-                            helper_auth_tag = bytes.fromhex(helper['authTag'])
-                            
-                            # Decrypt helper script
-                            try:
-                                helper_decrypted = aesgcm.decrypt(helper_iv, helper_encrypted + helper_auth_tag, None)
-                            except:
-                                helper_decrypted = aesgcm.decrypt(helper_iv, helper_encrypted, None)
-                            
-                            helper_content = helper_decrypted.decode('utf-8')
-                            helper_content = helper_content.replace('\r\n', '\n').replace('\r', '\n')
-                            
-                            # Save helper script to temp directory
-                            helper_path = os.path.join(temp_dir, helper_name)
-                            with open(helper_path, 'w', encoding='utf-8', newline='\n') as f:
-                                f.write(helper_content)
-                            
-                            print(f'[HELPER] Saved helper script: {helper_name}')
-                            
+                            modules[helper['name'][:-3]] = future.result()
                         except Exception as e:
-                            print(f'[HELPER] Failed to decrypt/save {helper.get("name", "unknown")}: {e}')
-                    
-                    # Save main script to temp directory
-                    main_script_path = os.path.join(temp_dir, script_name)
-                    with open(main_script_path, 'w', encoding='utf-8', newline='\n') as f:
-                        f.write(script_content)
-                    
-                    print(f'[HELPER] Saved main script: {script_name}')
-                    
-                    # Execute the script from temp directory (so it can find helpers)
-                    args_str = [str(arg) for arg in arguments]
-                    cmd = ['python', main_script_path] + args_str
-                    result = subprocess.run(
-                        cmd,
-                        capture_output=True,
-                        text=True,
-                        timeout=60,
-                        cwd=temp_dir,  # Run from temp directory
-                        creationflags=CREATE_NO_WINDOW
-                    )
+                            print(f'[HELPER] Failed to decrypt {helper.get("name", "unknown")}: {e}')
+                    try:
+                        result = SCRIPT_WORKERS.run(script_content, [script_name] + args_str, modules=modules)
+                    except OSError as e:
+                        print(f'[WORKER] Script worker unavailable ({e}), spawning python')
+                        if helper_futures:
+                            result = self.run_with_helpers(script_content, script_name, args_str, helper_futures)
+                        else:
+                            result = subprocess.run(
+                                ['python', '-'] + args_str,
+                                input=script_content.encode('utf-8'),
+                                capture_output=True,
+                                timeout=60,
+                                env=SCRIPT_ENV,
+                                creationflags=CREATE_NO_WINDOW
+                            )
+                else:
+                    result = self.run_with_helpers(script_content, script_name, args_str, helper_futures)
+                
+                # Subprocess output stays bytes (json.loads takes them as-is); only text fields get decoded
+                if result.returncode != 0:
+                    return {
+                        'success': False,
+                        'error': as_text(result.stderr).strip() if result.stderr else 'Script execution failed',
+                        'output': as_text(result.stdout).strip()
+                    }
+                
+                # Try to parse JSON output
+                try:
+                    output_json = json.loads(result.stdout)
                     
-                    if result.returncode != 0:
-                        return {
-                            'success': False,
-                            'error': result.stderr.strip() if result.stderr else 'Script execution failed',
-                            'output': result.stdout.strip()
-                        }
+                    # Check if this is a screenshot - ONLY add base64
+                    if output_json.get('success') and 'path' in output_json:
+                        print('[API-SCRIPT] Screenshot detected, adding base64...')
+                        enhanced = self.add_base64_screenshot(output_json)
+                        if enhanced:
+                            output_json = enhanced
                     
-                    # Try to parse JSON output
-                    try:
-                        output_json = json.loads(result.stdout)
-                        
-                        # Check if this is a screenshot - ONLY add base64
-                        if output_json.get('success') and 'path' in output_json:
-                            print('[API-SCRIPT] Screenshot detected, adding base64...')
-                            enhanced = self.add_base64_screenshot(output_json)
-                            if enhanced:
-                                output_json = enhanced
-                        
-                        return {
-                            'success': True,
-                            **output_json
-                        }
-                    except json.JSONDecodeError:
-                        # Not JSON, return as text
-                        return {
-                            'success': True,
-                            'output': result.stdout.strip()
-                        }
-                finally:
-                    # Clean up temp directory and all files
-                    try:
-                        import shutil
-                        shutil.rmtree(temp_dir)
-                        print(f'[HELPER] Cleaned up temp directory')
-                    except Exception as e:
-                        print(f'[HELPER] Failed to clean up temp directory: {e}')
+                    return {
+                        'success': True,
+                        **output_json
+                    }
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    # Not JSON, return as text
+                    return {
+                        'success': True,
+                        'output': as_text(result.stdout).strip()
+                    }
                         
         except Exception as e:
             print(f'[ERROR] Decryption/execution failed: {str(e)}')
@@ -248,31 +754,84 @@ class AgentHandler(BaseHTTPRequestHandler):
                 'error': f'Decryption/execution failed: {str(e)}'
             }
     
+    def run_with_helpers(self, script_content, script_name, args_str, helper_futures):
+        """Write the main script and its helpers to a scratch directory and run it from there"""
+        # Numbered subdirectory under the per-agent root instead of a fresh mkdtemp per call
+        temp_dir = os.path.join(SCRIPT_ROOT, str(next(SCRIPT_COUNTER)))
+        os.mkdir(temp_dir)
+        print(f'[HELPER] Created temp directory: {temp_dir}')
+        
+        try:
+            # Collect decrypted helper scripts and save them first
+            for helper, future in helper_futures:
+                try:
+                    helper_name = helper['name']
+                    helper_content = future.result()
+                    
+                    # Save helper script to temp directory
+                    helper_path = os.path.join(temp_dir, helper_name)
+                    with open(helper_path, 'w', encoding='utf-8', newline='\n') as f:
+                        f.write(helper_content)
+                    
+                    print(f'[HELPER] Saved helper script: {helper_name}')
+                    
+                except Exception as e:
+                    print(f'[HELPER] Failed to decrypt/save {helper.get("name", "unknown")}: {e}')
+            
+            # Save main script to temp directory
+            main_script_path = os.path.join(temp_dir, script_name)
+            with open(main_script_path, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(script_content)
+            
+            print(f'[HELPER] Saved main script: {script_name}')
+            
+            # Execute the script from temp directory (so it can find helpers)
+            return subprocess.run(
+                ['python', main_script_path] + args_str,
+                capture_output=True,
+                timeout=60,
+                cwd=temp_dir,  # Run from temp directory
+                env=SCRIPT_ENV,
+                creationflags=CREATE_NO_WINDOW
+            )
+        finally:
+            # Clean up temp directory and all files
+            try:
+                shutil.rmtree(temp_dir)
+                print(f'[HELPER] Cleaned up temp directory')
+            except Exception as e:
+                print(f'[HELPER] Failed to clean up temp directory: {e}')
+    
     def add_base64_screenshot(self, response):
         """Add base64 screenshot to response - ONLY enhancement we do
         All other data (OCR, visual, UI elements, Windows API) comes from API service scripts
         """
         try:
             screenshot_path = response.get('path')
-            if not screenshot_path or not os.path.exists(screenshot_path):
+            try:
+                with open(screenshot_path, 'rb') as f:
+                    raw = f.read()
+            except (TypeError, OSError):
                 print('[API-SCRIPT] No screenshot path found')
                 return None
             
             print(f'[API-SCRIPT] Loading screenshot from {screenshot_path}')
             
             # Load the image and convert to base64, my Mom once told me "strong people are prone to make others near them stronger", are you strong?
-            img = Image.open(screenshot_path)
-            
-            # Convert to base64
-            buffer = io.BytesIO()
-            img.save(buffer, format='PNG')
-            img_base64 = base64.b64encode(buffer.getvalue()).decode()
+            image_format = sniff_format(raw)
+            if image_format in ('jpeg', 'webp') or (image_format == SCREENSHOT_FORMAT and not png_fast_compressed(raw)):
+                # Already encoded the way we'd send it (or already lossy) - send the file bytes as-is
+                img_base64 = base64.b64encode(raw)
+            else:
+                # Includes PNGs saved at a fast zlib level (screenshot.py), re-encoded at the default level
+                img_base64, image_format = encode_image(Image.open(io.BytesIO(raw)), SCREENSHOT_FORMAT)
             
             print(f'[API-SCRIPT] Converted to base64: {len(img_base64)} bytes')
             
             # Preserve ALL data from the API service script, just add base64, At this point, Akil Hassane wants to drink Tonic Water
             enhanced = {**response}
             enhanced['screenshot'] = img_base64
+            enhanced['format'] = image_format
             
             # Log what data we received from the API service script
             print(f'[API-SCRIPT] Data from API service:')
@@ -285,7 +844,6 @@ class AgentHandler(BaseHTTPRequestHandler):
             return enhanced
             
         except Exception as e:
-            import traceback
             print(f'[API-SCRIPT] Failed to add base64: {e}')
             print(f'[API-SCRIPT] Traceback: {traceback.format_exc()}')
             return None
@@ -314,13 +872,9 @@ class AgentHandler(BaseHTTPRequestHandler):
             
             result = self.execute_command(command, args)
             
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
+            self.send_json(200, result)
             
         except Exception as e:
-            import traceback
             error_details = traceback.format_exc()
             print(f'[ERROR] {str(e)}')
             print(f'[TRACE] {error_details}')
@@ -393,7 +947,11 @@ class AgentHandler(BaseHTTPRequestHandler):
         elif command == 'keyboard_type':
             text = args['text']
             interval = args.get('interval', 0.05)
-            pyautogui.write(text, interval=interval)
+            if interval == 0 and user32 is not None:
+                # No pacing requested - hand the whole string to SendInput at once
+                send_text(text)
+            else:
+                pyautogui.write(text, interval=interval)
             return {
                 'success': True,
                 'message': f'Typed {len(text)} characters',
@@ -410,14 +968,13 @@ class AgentHandler(BaseHTTPRequestHandler):
             }
         
         elif command == 'screenshot':
-            screenshot = ImageGrab.grab()
-            buffer = io.BytesIO()
-            screenshot.save(buffer, format='PNG')
-            img_base64 = base64.b64encode(buffer.getvalue()).decode()
+            screenshot = grab_screen()
+            img_base64, image_format = encode_image(screenshot, args.get('format', SCREENSHOT_FORMAT).lower())
             
             return {
                 'success': True,
                 'screenshot': img_base64,
+                'format': image_format,
                 'width': screenshot.width,
                 'height': screenshot.height,
                 'message': 'Screenshot captured'
@@ -425,13 +982,7 @@ class AgentHandler(BaseHTTPRequestHandler):
         
         elif command == 'powershell':
             cmd = args['command']
-            result = subprocess.run(
-                ['powershell', '-Command', cmd],
-                capture_output=True,
-                text=True,
-                timeout=30,
-                creationflags=CREATE_NO_WINDOW
-            )
+            result = POWERSHELL.run(cmd)
             return {
                 'success': result.returncode == 0,
                 'output': result.stdout.strip(),
@@ -442,12 +993,13 @@ class AgentHandler(BaseHTTPRequestHandler):
             commands = args.get('commands', [])
             results = []
             
-            for cmd in commands:
-                try:
-                    result = self.execute_command(cmd['command'], cmd.get('args', {}))
-                    results.append(result)
-                except Exception as e:
-                    results.append({'success': False, 'error': str(e)})
+            # Runs of independent commands fan out on the pool; input commands keep their order on this thread
+            for parallel, group in itertools.groupby(commands, key=is_parallel_safe):
+                group = list(group)
+                if parallel and len(group) > 1:
+                    results.extend(BATCH_POOL.map(self.run_batch_command, group))
+                else:
+                    results.extend(map(self.run_batch_command, group))
             
             return {
                 'success': True,
@@ -458,6 +1010,13 @@ class AgentHandler(BaseHTTPRequestHandler):
         else:
             raise ValueError(f'Unknown command: {command}')
     
+    def run_batch_command(self, cmd):
+        """Run one batch entry, reporting failures in its result instead of aborting the batch"""
+        try:
+            return self.execute_command(cmd['command'], cmd.get('args', {}))
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
     def do_GET(self):
         if self.path == '/health':
             self.send_response(200)
@@ -468,7 +1027,9 @@ class AgentHandler(BaseHTTPRequestHandler):
                 'agent': 'Windows Agent (Pure API Service Mode)',
                 'version': '6.0.0',
                 'mode': 'pure_api_service',
-                'local_generation': False
+                'local_generation': False,
+                # Encrypted payload field encodings this agent decodes, callers pass them on to the API
+                'encodings': ['hex', 'base64']
             }).encode())
         else:
             self.send_response(404)
@@ -479,7 +1040,9 @@ class AgentHandler(BaseHTTPRequestHandler):
 
 if __name__ == '__main__':
     try:
-        server = HTTPServer(('0.0.0.0', PORT), AgentHandler)
+        # One thread per request (daemon threads) so a long script doesn't stall screenshots or input
+        server = ThreadingHTTPServer(('0.0.0.0', PORT), AgentHandler)
+        SCRIPT_WORKERS.warm()
         print(f'[READY] Agent listening on port {PORT}')
         print('[READY] Pure API service mode - NO local generation')
         server.serve_forever()
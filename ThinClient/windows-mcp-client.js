@@ -163,6 +163,27 @@ const TOOLS = [
   }
 ];
 
+/**
+ * Payload encoding the Windows Agent accepts, read once from its /health
+ * Agents that don't list 'base64' in their encodings (or can't be reached) get hex
+ */
+let agentPayloadEncoding = null;
+async function getAgentPayloadEncoding() {
+  if (agentPayloadEncoding === null) {
+    const AGENT_URL = process.env.AGENT_URL || 'http://localhost:8888';
+    try {
+      const response = await fetch(`${AGENT_URL}/health`, { signal: AbortSignal.timeout(5000) });
+      const health = response.ok ? await response.json() : {};
+      agentPayloadEncoding = (health.encodings || []).includes('base64') ? 'base64' : 'hex';
+    } catch (error) {
+      log(`Agent health check failed, using hex payloads for now: ${error.message}`);
+      return 'hex';
+    }
+    log(`Agent payload encoding: ${agentPayloadEncoding}`);
+  }
+  return agentPayloadEncoding;
+}
+
 /**
  * Forward encrypted payload to Windows Agent for decryption and execution
  */
@@ -242,7 +263,8 @@ async function callApiService(tool, args) {
         headers: {
           'Authorization': `Bearer ${API_SERVICE_KEY}`,
           'Content-Type': 'application/json',
-          'Connection': 'keep-alive'
+          'Connection': 'keep-alive',
+          'X-Payload-Encoding': await getAgentPayloadEncoding()
         },
         body: JSON.stringify({
           tool: tool,
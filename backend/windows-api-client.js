@@ -12,6 +12,7 @@ class WindowsAPIClient {
     this.apiServiceKey = config.apiServiceKey;
     this.agentApiKey = config.agentApiKey;
     this.connected = false;
+    this.payloadEncoding = 'hex';
     this.tools = [];
     this.fetch = null;
   }
@@ -63,6 +64,9 @@ class WindowsAPIClient {
       const agentHealth = await agentResponse.json();
       console.log(`[WindowsAPI] ✅ Agent connected - Mode: ${agentHealth.mode}`);
       
+      // Older agents only decode hex payloads and don't list encodings
+      this.payloadEncoding = (agentHealth.encodings || []).includes('base64') ? 'base64' : 'hex';
+      
       // Load available tools from API
       await this.loadTools();
       
@@ -132,7 +136,8 @@ class WindowsAPIClient {
         method: 'POST',
         headers: {
           'Authorization': `Bearer ${this.apiServiceKey}`,
-          'Content-Type': 'application/json'
+          'Content-Type': 'application/json',
+          'X-Payload-Encoding': this.payloadEncoding
         },
         body: JSON.stringify({
           tool: toolName,
@@ -22,7 +22,7 @@ def execute_powershell(command):
     try:
         # Execute PowerShell command
         result = subprocess.run(
-            ['powershell', '-Command', command],
+            ['powershell', '-NoProfile', '-Command', command],
             capture_output=True,
             text=True,
             timeout=30,
@@ -168,6 +168,30 @@ function encrypt(text, keyHex) {
   };
 }
 
+/**
+ * Re-encode an encrypted payload's binary fields from hex to base64
+ * Only sent to agents that list 'base64' in their /health encodings (a third smaller than hex
+ * and faster to decode); older agents only understand hex and keep getting it
+ * @param {Object} payload - Result of a tool function, fields in hex
+ * @returns {Object} The same payload with base64 fields and encoding: 'base64'
+ */
+function toBase64Payload(payload) {
+  const b64 = (value) => Buffer.from(value, 'hex').toString('base64');
+  
+  for (const field of ['encryptedScript', 'encryptedCommand', 'iv', 'authTag']) {
+    if (payload[field]) {
+      payload[field] = b64(payload[field]);
+    }
+  }
+  for (const helper of payload.helperScripts || []) {
+    helper.encryptedContent = b64(helper.encryptedContent);
+    helper.iv = b64(helper.iv);
+    helper.authTag = b64(helper.authTag);
+  }
+  payload.encoding = 'base64';
+  return payload;
+}
+
 /**
  * Get decryption instructions for client
  * @param {string} keyHex - Encryption key
@@ -222,6 +246,7 @@ async function prepareEncryptedToolExecution(scriptName, args, encryptionKey, he
       encryptedScript: encrypted.encrypted,
       iv: encrypted.iv,
       authTag: encrypted.authTag,
+      encoding: 'hex',
       scriptName: scriptName,
       arguments: args,
       decryption: getDecryptionInstructions(encryptionKey),
@@ -277,6 +302,7 @@ async function executePowerShell(command, encryptionKey) {
       encryptedCommand: encrypted.encrypted,
       iv: encrypted.iv,
       authTag: encrypted.authTag,
+      encoding: 'hex',
       decryption: getDecryptionInstructions(encryptionKey),
       instruction: 'Decrypt and execute this PowerShell command'
     };
@@ -310,7 +336,7 @@ async function takeScreenshot(encryptionKey) {
  * Move mouse
  */
 async function moveMouse(x, y, encryptionKey) {
-  return await prepareEncryptedToolExecution('mouse-move.py', ['--x', x, '--y', y, '--json'], encryptionKey);
+  return await prepareEncryptedToolExecution('mouse-move.py', ['--x', x, '--y', y, '--json'], encryptionKey, ['mouse_path.py']);
 }
 
 /**
@@ -319,7 +345,7 @@ async function moveMouse(x, y, encryptionKey) {
 async function clickMouse(x, y, button = 'left', doubleClick = false, encryptionKey) {
   const args = ['--x', x, '--y', y, '--button', button, '--json'];
   if (doubleClick) args.push('--double');
-  return await prepareEncryptedToolExecution('mouse-click.py', args, encryptionKey);
+  return await prepareEncryptedToolExecution('mouse-click.py', args, encryptionKey, ['mouse_path.py']);
 }
 
 /**
@@ -351,7 +377,7 @@ async function scrollMouse(direction, clicks = 3, x = null, y = null, encryption
   if (x !== null && y !== null) {
     args.push('--x', x, '--y', y);
   }
-  return await prepareEncryptedToolExecution('mouse-scroll.py', args, encryptionKey);
+  return await prepareEncryptedToolExecution('mouse-scroll.py', args, encryptionKey, ['mouse_path.py']);
 }
 
 /**
@@ -496,6 +522,11 @@ app.post('/api/execute', authenticate, async (req, res) => {
         return res.status(400).json({ success: false, error: `Unknown tool: ${tool}` });
     }
     
+    // Callers pass on the encodings the agent advertised; anything else gets hex
+    if (result.success && result.encrypted && req.get('X-Payload-Encoding') === 'base64') {
+      result = toBase64Payload(result);
+    }
+    
     res.json(result);
     
   } catch (error) {
@@ -7,9 +7,79 @@ Uses OCR to search for specific text on the screen
 import json
 import sys
 import argparse
-from PIL import ImageGrab
+import re
+from PIL import Image, ImageGrab
 import pytesseract
 
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+def grab_screen():
+    """Capture the primary monitor as an RGB image (mss BitBlt/GetDIBits, ImageGrab fallback)"""
+    if not MSS_AVAILABLE:
+        return ImageGrab.grab()
+    with mss.mss() as sct:
+        shot = sct.grab(sct.monitors[1])
+    return Image.frombytes('RGB', shot.size, shot.bgra, 'raw', 'BGRX')
+
+# LSTM engine only, sparse-text layout (screens are scattered labels, not paragraphs)
+OCR_CONFIG = '--oem 1 --psm 11'
+OCR_WHITELIST = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+
+def ocr_config(search_text, case_sensitive):
+    """Tesseract config for a search, narrowing the alphabet when the target is plain ASCII alphanumerics"""
+    if search_text.isascii() and search_text.isalnum() and not case_sensitive:
+        return f'{OCR_CONFIG} -c tessedit_char_whitelist={OCR_WHITELIST}'
+    return OCR_CONFIG
+
+def ocr_preview(texts, limit=500):
+    """Join OCR words only as far as the preview needs instead of the whole screen"""
+    parts = []
+    length = -1
+    for text in texts:
+        if text.strip():
+            parts.append(text)
+            length += len(text) + 1
+            if length > limit:
+                break
+    preview = ' '.join(parts)
+    return preview[:limit] + ('...' if len(preview) > limit else '')
+
+# Coarse pre-pass: OCR a downscaled frame, then re-OCR full-resolution crops around candidates only.
+# 2x keeps ~12px UI text legible to tesseract; at 4x most of it drops below what the LSTM can read.
+COARSE_SCALE = 2
+CROP_MARGIN = 16
+MAX_CANDIDATES = 20
+
+def run_ocr(image, config):
+    """OCR an image into tesseract's per-box dict"""
+    return pytesseract.image_to_data(image, lang='eng', config=config, output_type=pytesseract.Output.DICT)
+
+def match_indices(texts, search_text, partial_match, case_sensitive):
+    """Indices of OCR boxes matching the search, found in one C-level pass instead of per-box lower()/compare"""
+    if partial_match:
+        pattern = re.compile(re.escape(search_text), 0 if case_sensitive else re.IGNORECASE)
+        return [i for i, text in enumerate(texts) if text.strip() and pattern.search(text)]
+    target = search_text if case_sensitive else search_text.lower()
+    return [i for i, text in enumerate(texts) if text.strip() and (text if case_sensitive else text.lower()) == target]
+
+def build_matches(ocr_data, hits, offset_x=0, offset_y=0):
+    """Match dicts for the hit boxes, shifted back into screen coordinates"""
+    texts, lefts, tops, widths, heights, confs = (ocr_data[key] for key in ('text', 'left', 'top', 'width', 'height', 'conf'))
+    return [{
+        'text': texts[i],
+        'confidence': round(float(confs[i]) / 100.0, 2),  # Convert to 0-1 range
+        'position': {
+            'x': lefts[i] + offset_x,
+            'y': tops[i] + offset_y,
+            'width': widths[i],
+            'height': heights[i]
+        }
+    } for i in hits]
+
 def find_text_on_screen(search_text, partial_match=True, case_sensitive=False):
     """
     Find text on screen using OCR
@@ -24,54 +94,40 @@ def find_text_on_screen(search_text, partial_match=True, case_sensitive=False):
     """
     try:
         # Capture screenshot
-        screenshot = ImageGrab.grab()
+        screenshot = grab_screen()
+        config = ocr_config(search_text, case_sensitive)
         
-        # Perform OCR with detailed data
-        ocr_data = pytesseract.image_to_data(screenshot, output_type=pytesseract.Output.DICT)
+        # Coarse pass on the downscaled frame to locate candidates
+        small = screenshot.resize((screenshot.width // COARSE_SCALE, screenshot.height // COARSE_SCALE), Image.BILINEAR)
+        coarse = run_ocr(small, config)
+        candidates = match_indices(coarse['text'], search_text, partial_match, case_sensitive)
         
-        # Extract all text for context
-        all_text = ' '.join([text for text in ocr_data['text'] if text.strip()])
-        
-        # Search for matches
         matches = []
-        n_boxes = len(ocr_data['text'])
-        
-        # Prepare search text
-        search_lower = search_text.lower() if not case_sensitive else search_text
+        texts = []
+        if 0 < len(candidates) <= MAX_CANDIDATES:
+            # Verify each candidate on a full-resolution crop for accurate boxes and confidence
+            seen = set()
+            for i in candidates:
+                left = max(0, coarse['left'][i] * COARSE_SCALE - CROP_MARGIN)
+                top = max(0, coarse['top'][i] * COARSE_SCALE - CROP_MARGIN)
+                right = min(screenshot.width, (coarse['left'][i] + coarse['width'][i]) * COARSE_SCALE + CROP_MARGIN)
+                bottom = min(screenshot.height, (coarse['top'][i] + coarse['height'][i]) * COARSE_SCALE + CROP_MARGIN)
+                crop_data = run_ocr(screenshot.crop((left, top, right, bottom)), config)
+                texts.extend(crop_data['text'])
+                crop_hits = match_indices(crop_data['text'], search_text, partial_match, case_sensitive)
+                for match in build_matches(crop_data, crop_hits, left, top):
+                    # Neighbouring candidates can share a crop, report each box once
+                    key = (match['text'], match['position']['x'], match['position']['y'])
+                    if key not in seen:
+                        seen.add(key)
+                        matches.append(match)
         
-        for i in range(n_boxes):
-            text = ocr_data['text'][i]
-            if not text.strip():
-                continue
-            
-            # Prepare comparison text
-            compare_text = text.lower() if not case_sensitive else text
-            
-            # Check for match
-            found = False
-            if partial_match:
-                found = search_lower in compare_text
-            else:
-                found = search_lower == compare_text
-            
-            if found:
-                # Get bounding box
-                x = ocr_data['left'][i]
-                y = ocr_data['top'][i]
-                w = ocr_data['width'][i]
-                h = ocr_data['height'][i]
-                conf = float(ocr_data['conf'][i]) / 100.0  # Convert to 0-1 range
-                
-                matches.append({
-                    'text': text,
-                    'confidence': round(conf, 2),
-                    'position': {
-                        'x': x,
-                        'y': y,
-                        'width': w,
-                        'height': h
-                    }
-                })
+        if not matches:
+            # Nothing (or too much) found coarsely, or no candidate held up at full resolution -
+            # a miss at low resolution is not proof, so do the full pass
+            ocr_data = run_ocr(screenshot, config)
+            texts = ocr_data['text']
+            matches = build_matches(ocr_data, match_indices(texts, search_text, partial_match, case_sensitive))
         
         return {
             'success': True,
@@ -79,7 +135,7 @@ def find_text_on_screen(search_text, partial_match=True, case_sensitive=False):
             'text': search_text,
             'matches': matches,
             'match_count': len(matches),
-            'ocr_text': all_text[:500] + ('...' if len(all_text) > 500 else ''),  # Truncate for readability
+            'ocr_text': ocr_preview(texts),  # Truncate for readability
             'screen_size': {
                 'width': screenshot.width,
                 'height': screenshot.height
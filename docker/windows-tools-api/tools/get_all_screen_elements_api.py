@@ -7,8 +7,16 @@ Uses ctypes (built-in) instead of pywin32 for better compatibility
 
 import json
 import sys
+import threading
 import ctypes
-from ctypes import wintypes, windll, byref, POINTER, Structure, c_int, c_uint, c_wchar
+from ctypes import wintypes, byref, POINTER, Structure, c_int, c_uint, c_wchar
+
+# orjson is optional, a much faster serializer than the stdlib one
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Windows API constants
 GWL_EXSTYLE = -20
@@ -16,6 +24,14 @@ WS_EX_TOOLWINDOW = 0x00000080
 WS_EX_APPWINDOW = 0x00040000
 SW_SHOWMAXIMIZED = 3
 SW_SHOWMINIMIZED = 2
+TEXT_BUFFER_SIZE = 512
+
+# Wall-clock budget for the whole scan; when it runs out the enum callbacks stop EnumWindows
+SCAN_DEADLINE = 7.0
+STOP_SCAN = threading.Event()
+
+# Window classes that host system tray icons (everything else is skipped by class)
+TRAY_ICON_CLASSES = {'ToolbarWindow32', 'TrayButton', 'SysPager', 'Button'}
 
 # Define Windows structures
 class RECT(Structure):
@@ -36,8 +52,11 @@ class WINDOWPLACEMENT(Structure):
         ('rcNormalPosition', RECT)
     ]
 
-# Windows API functions
-user32 = windll.user32
+# Callback type
+EnumWindowsProc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+
+# Windows API functions (private handle so argtypes don't leak into windll.user32)
+user32 = ctypes.WinDLL("user32", use_last_error=True)
 EnumWindows = user32.EnumWindows
 EnumChildWindows = user32.EnumChildWindows
 GetWindowTextW = user32.GetWindowTextW
@@ -50,20 +69,129 @@ FindWindowW = user32.FindWindowW
 FindWindowExW = user32.FindWindowExW
 GetForegroundWindow = user32.GetForegroundWindow
 GetClassNameW = user32.GetClassNameW
+IsIconic = user32.IsIconic
+IsZoomed = user32.IsZoomed
 
-# Callback type
-EnumWindowsProc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+# Declare signatures once so ctypes doesn't infer types on every call
+EnumWindows.argtypes = [EnumWindowsProc, wintypes.LPARAM]
+EnumWindows.restype = wintypes.BOOL
+EnumChildWindows.argtypes = [wintypes.HWND, EnumWindowsProc, wintypes.LPARAM]
+EnumChildWindows.restype = wintypes.BOOL
+GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, c_int]
+GetWindowTextW.restype = c_int
+GetWindowTextLengthW.argtypes = [wintypes.HWND]
+GetWindowTextLengthW.restype = c_int
+IsWindowVisible.argtypes = [wintypes.HWND]
+IsWindowVisible.restype = wintypes.BOOL
+GetWindowRect.argtypes = [wintypes.HWND, POINTER(RECT)]
+GetWindowRect.restype = wintypes.BOOL
+GetWindowLongW.argtypes = [wintypes.HWND, c_int]
+GetWindowLongW.restype = wintypes.LONG
+GetWindowPlacement.argtypes = [wintypes.HWND, POINTER(WINDOWPLACEMENT)]
+GetWindowPlacement.restype = wintypes.BOOL
+FindWindowW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR]
+FindWindowW.restype = wintypes.HWND
+FindWindowExW.argtypes = [wintypes.HWND, wintypes.HWND, wintypes.LPCWSTR, wintypes.LPCWSTR]
+FindWindowExW.restype = wintypes.HWND
+GetForegroundWindow.argtypes = []
+GetForegroundWindow.restype = wintypes.HWND
+GetClassNameW.argtypes = [wintypes.HWND, wintypes.LPWSTR, c_int]
+GetClassNameW.restype = c_int
+IsIconic.argtypes = [wintypes.HWND]
+IsIconic.restype = wintypes.BOOL
+IsZoomed.argtypes = [wintypes.HWND]
+IsZoomed.restype = wintypes.BOOL
 
-def get_window_text(hwnd):
-    """Get window title text"""
-    length = GetWindowTextLengthW(hwnd)
-    if length == 0:
+def get_window_text(hwnd, buff=None):
+    """Get window title text (truncated to the buffer), reusing buff when given"""
+    if buff is None:
+        buff = ctypes.create_unicode_buffer(TEXT_BUFFER_SIZE)
+    if not GetWindowTextW(hwnd, buff, len(buff)):
         return ""
-    buff = ctypes.create_unicode_buffer(length + 1)
-    GetWindowTextW(hwnd, buff, length + 1)
     return buff.value
 
-def get_taskbar_buttons():
+def _dispatch_enum(hwnd, lParam):
+    """Forward an enumerated hwnd to the Python callback passed through lParam"""
+    return ctypes.cast(lParam, POINTER(ctypes.py_object)).contents.value(hwnd, lParam)
+
+# One callback trampoline shared by every enumeration
+_enum_windows_proc = EnumWindowsProc(_dispatch_enum)
+
+def enum_windows(callback, parent=None):
+    """Call callback(hwnd, lParam) for each top-level window, or each child of parent"""
+    ref = ctypes.py_object(callback)
+    lparam = ctypes.addressof(ref)
+    if parent:
+        return EnumChildWindows(parent, _enum_windows_proc, lparam)
+    return EnumWindows(_enum_windows_proc, lparam)
+
+def enumerate_app_windows():
+    """Enumerate visible, titled, non-tool top-level windows once
+    
+    Both get_taskbar_buttons and get_all_windows are derived from this list.
+    """
+    windows = []
+    
+    # Bind the API calls to closure locals for the callback
+    _IsWindowVisible = IsWindowVisible
+    _GetWindowLongW = GetWindowLongW
+    _GetWindowRect = GetWindowRect
+    _IsIconic = IsIconic
+    _IsZoomed = IsZoomed
+    
+    # Scratch buffers reused for every window in this scan
+    rect = RECT()
+    text_buffer = ctypes.create_unicode_buffer(TEXT_BUFFER_SIZE)
+    
+    def enum_callback(hwnd, lParam):
+        # Returning False ends EnumWindows early once the deadline passes
+        if STOP_SCAN.is_set():
+            return False
+        if _IsWindowVisible(hwnd):
+            try:
+                # Cheapest rejections first, the title is fetched last
+                ex_style = _GetWindowLongW(hwnd, GWL_EXSTYLE)
+                
+                # Skip tool windows unless they have APPWINDOW style
+                if (ex_style & WS_EX_TOOLWINDOW) and not (ex_style & WS_EX_APPWINDOW):
+                    return True
+                
+                # Get window rect
+                if not _GetWindowRect(hwnd, byref(rect)):
+                    return True
+                
+                width = rect.right - rect.left
+                height = rect.bottom - rect.top
+                
+                # Skip tiny windows
+                if width < 10 or height < 10:
+                    return True
+                
+                text = get_window_text(hwnd, text_buffer)
+                if not text:
+                    return True
+                
+                windows.append({
+                    'hwnd': hwnd,
+                    'text': text,
+                    'left': rect.left,
+                    'top': rect.top,
+                    'right': rect.right,
+                    'bottom': rect.bottom,
+                    'ex_style': ex_style,
+                    'is_minimized': bool(_IsIconic(hwnd)),
+                    'is_maximized': bool(_IsZoomed(hwnd))
+                })
+                
+            except Exception as e:
+                pass
+        
+        return True
+    
+    enum_windows(enum_callback)
+    return windows
+
+def get_taskbar_buttons(windows=None):
     """Get all taskbar button information using Windows API
     
     Captures ALL taskbar elements including:
@@ -90,63 +218,19 @@ def get_taskbar_buttons():
         taskbar_y = taskbar_rect.top
         screen_width = taskbar_rect.right - taskbar_rect.left
         
-        # Get all windows that would have taskbar buttons
-        windows_with_buttons = []
-        
-        def enum_callback(hwnd, lParam):
-            if IsWindowVisible(hwnd):
-                try:
-                    text = get_window_text(hwnd)
-                    if not text:
-                        return True
-                    
-                    # Get window style
-                    ex_style = GetWindowLongW(hwnd, GWL_EXSTYLE)
-                    
-                    # Skip tool windows unless they have APPWINDOW style
-                    if (ex_style & WS_EX_TOOLWINDOW) and not (ex_style & WS_EX_APPWINDOW):
-                        return True
-                    
-                    # Get window rect
-                    rect = RECT()
-                    if not GetWindowRect(hwnd, byref(rect)):
-                        return True
-                    
-                    width = rect.right - rect.left
-                    height = rect.bottom - rect.top
-                    
-                    # Skip tiny windows
-                    if width < 10 or height < 10:
-                        return True
-                    
-                    # Check if minimized
-                    placement = WINDOWPLACEMENT()
-                    placement.length = ctypes.sizeof(WINDOWPLACEMENT)
-                    is_minimized = False
-                    
-                    if GetWindowPlacement(hwnd, byref(placement)):
-                        is_minimized = placement.showCmd == SW_SHOWMINIMIZED
-                    
-                    # Skip minimized windows (they're off-screen)
-                    if is_minimized:
-                        return True
-                    
-                    windows_with_buttons.append({
-                        'name': text,
-                        'hwnd': hwnd
-                    })
-                    
-                except Exception as e:
-                    pass
-            
-            return True
+        if windows is None:
+            windows = enumerate_app_windows()
         
-        callback = EnumWindowsProc(enum_callback)
-        EnumWindows(callback, 0)
+        # Titles of windows that would have taskbar buttons (minimized ones are off-screen)
+        button_names = [window['text'] for window in windows if not window['is_minimized']]
+        
+        # Scratch buffers reused for every tray child
+        rect = RECT()
+        text_buffer = ctypes.create_unicode_buffer(TEXT_BUFFER_SIZE)
         
         # Calculate button positions (Windows 11 centers the button group)
         button_width = 44
-        app_buttons_width = len(windows_with_buttons) * button_width
+        app_buttons_width = len(button_names) * button_width
         
         # Start button is to the left of the centered group
         start_x = taskbar_rect.left + (screen_width // 2) - (app_buttons_width // 2) - 48
@@ -223,21 +307,21 @@ def get_taskbar_buttons():
         # 6. Add app buttons (centered group)
         app_start_x = taskbar_rect.left + (screen_width - app_buttons_width) // 2
         
-        for i, window in enumerate(windows_with_buttons):
-            button_x = app_start_x + (i * button_width)
-            
-            taskbar_buttons.append({
-                'name': window['name'],
-                'type': 'AppButton',
-                'x': button_x,
-                'y': taskbar_y,
-                'width': button_width,
-                'height': taskbar_height,
-                'center_x': button_x + button_width // 2,
-                'center_y': taskbar_y + taskbar_height // 2,
-                'window_title': window['name'],
-                'is_app_button': True
-            })
+        button_xs = range(app_start_x, app_start_x + app_buttons_width, button_width)
+        app_center_y = taskbar_y + taskbar_height // 2
+        
+        taskbar_buttons.extend({
+            'name': name,
+            'type': 'AppButton',
+            'x': button_x,
+            'y': taskbar_y,
+            'width': button_width,
+            'height': taskbar_height,
+            'center_x': button_x + button_width // 2,
+            'center_y': app_center_y,
+            'window_title': name,
+            'is_app_button': True
+        } for name, button_x in zip(button_names, button_xs))
         
         # 7. Enumerate system tray icons (right side)
         tray_notify = FindWindowExW(taskbar, None, "TrayNotifyWnd", None)
@@ -247,24 +331,32 @@ def get_taskbar_buttons():
             if GetWindowRect(tray_notify, byref(tray_rect)):
                 # Add individual system tray icons
                 tray_icons = []
+                class_name = ctypes.create_unicode_buffer(64)
                 
                 def enum_tray(hwnd, lParam):
+                    if STOP_SCAN.is_set():
+                        return False
                     try:
-                        class_name = ctypes.create_unicode_buffer(256)
-                        GetClassNameW(hwnd, class_name, 256)
-                        text = get_window_text(hwnd)
+                        # Reject by class first, fetch the text only for likely icons
+                        GetClassNameW(hwnd, class_name, 64)
+                        class_value = class_name.value
+                        if class_value not in TRAY_ICON_CLASSES:
+                            return True
                         
                         if IsWindowVisible(hwnd):
-                            rect = RECT()
                             if GetWindowRect(hwnd, byref(rect)):
                                 width = rect.right - rect.left
                                 height = rect.bottom - rect.top
                                 
-                                if width > 5 and height > 5 and text:
+                                if width > 5 and height > 5:
+                                    text = get_window_text(hwnd, text_buffer)
+                                    if not text:
+                                        return True
+                                    
                                     tray_icons.append({
                                         'name': text,
                                         'type': 'SystemTrayIcon',
-                                        'class': class_name.value,
+                                        'class': class_value,
                                         'x': rect.left,
                                         'y': rect.top,
                                         'width': width,
@@ -277,8 +369,7 @@ def get_taskbar_buttons():
                         pass
                     return True
                 
-                tray_callback = EnumWindowsProc(enum_tray)
-                EnumChildWindows(tray_notify, tray_callback, 0)
+                enum_windows(enum_tray, tray_notify)
                 
                 # Add detected tray icons
                 taskbar_buttons.extend(tray_icons)
@@ -331,69 +422,23 @@ def get_taskbar_buttons():
     
     return taskbar_buttons
 
-def get_all_windows():
+def get_all_windows(windows=None):
     """Get all visible windows with their properties using ctypes"""
-    windows = []
-    
-    def enum_callback(hwnd, lParam):
-        if IsWindowVisible(hwnd):
-            try:
-                text = get_window_text(hwnd)
-                if not text:
-                    return True
-                
-                # Get window style
-                ex_style = GetWindowLongW(hwnd, GWL_EXSTYLE)
-                
-                # Skip tool windows unless they have APPWINDOW style
-                if (ex_style & WS_EX_TOOLWINDOW) and not (ex_style & WS_EX_APPWINDOW):
-                    return True
-                
-                # Get window rect
-                rect = RECT()
-                if not GetWindowRect(hwnd, byref(rect)):
-                    return True
-                
-                width = rect.right - rect.left
-                height = rect.bottom - rect.top
-                
-                # Skip tiny windows
-                if width < 10 or height < 10:
-                    return True
-                
-                # Get window placement
-                placement = WINDOWPLACEMENT()
-                placement.length = ctypes.sizeof(WINDOWPLACEMENT)
-                is_maximized = False
-                is_minimized = False
-                
-                if GetWindowPlacement(hwnd, byref(placement)):
-                    is_maximized = placement.showCmd == SW_SHOWMAXIMIZED
-                    is_minimized = placement.showCmd == SW_SHOWMINIMIZED
-                
-                window_info = {
-                    'name': text,
-                    'type': 'Window',
-                    'x': rect.left,
-                    'y': rect.top,
-                    'width': width,
-                    'height': height,
-                    'center_x': (rect.left + rect.right) // 2,
-                    'center_y': (rect.top + rect.bottom) // 2,
-                    'is_maximized': is_maximized,
-                    'is_minimized': is_minimized
-                }
-                
-                windows.append(window_info)
-                
-            except Exception as e:
-                pass
-        
-        return True
+    if windows is None:
+        windows = enumerate_app_windows()
     
-    callback = EnumWindowsProc(enum_callback)
-    EnumWindows(callback, 0)
-    return windows
+    return [{
+        'name': window['text'],
+        'type': 'Window',
+        'x': window['left'],
+        'y': window['top'],
+        'width': window['right'] - window['left'],
+        'height': window['bottom'] - window['top'],
+        'center_x': (window['left'] + window['right']) // 2,
+        'center_y': (window['top'] + window['bottom']) // 2,
+        'is_maximized': window['is_maximized'],
+        'is_minimized': window['is_minimized']
+    } for window in windows]
 
 def get_focused_window():
     """Get the currently focused window using ctypes"""
@@ -414,31 +459,48 @@ def get_focused_window():
         pass
     return None
 
+def dump_json(data, indent=False):
+    """Serialize data to UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, indent=2 if indent else None).encode('utf-8')
+
+def print_json(data):
+    """Write data as one JSON line straight to the stdout buffer"""
+    sys.stdout.buffer.write(dump_json(data) + b'\n')
+    sys.stdout.flush()
+
 def main():
     """Main function to gather all screen elements"""
     try:
-        # Quick timeout protection - return immediately if taking too long
-        import time
-        start_time = time.time()
-        
-        # Get taskbar buttons (fast)
-        taskbar_buttons = get_taskbar_buttons()
+        # Timeout protection - the timer flips STOP_SCAN, which the enum callbacks check per window
+        deadline = threading.Timer(SCAN_DEADLINE, STOP_SCAN.set)
+        deadline.daemon = True
+        deadline.start()
+        
+        try:
+            # Enumerate top-level windows once for both the taskbar and window lists
+            app_windows = enumerate_app_windows()
+            
+            # Get taskbar buttons (fast)
+            taskbar_buttons = get_taskbar_buttons(app_windows)
+        finally:
+            deadline.cancel()
         
-        # Check timeout
-        if time.time() - start_time > 5:
+        if STOP_SCAN.is_set():
             raise TimeoutError("Execution taking too long")
         
         # Get all windows (fast)
-        windows = get_all_windows()
-        
-        # Check timeout again
-        if time.time() - start_time > 7:
-            raise TimeoutError("Execution taking too long")
+        windows = get_all_windows(app_windows)
         
         # Get focused window (very fast)
         focused_window = get_focused_window()
         
-        # Combine all elements
+        # Combine all elements (each is serialized once, tagged with its category)
+        for element in taskbar_buttons:
+            element['category'] = 'taskbar'
+        for element in windows:
+            element['category'] = 'window'
         all_elements = taskbar_buttons + windows
         
         # Create summary
@@ -447,25 +509,26 @@ def main():
             'taskbar_icons_count': len(taskbar_buttons),
             'ui_elements_count': len(taskbar_buttons),
             'windows_count': len(windows),
-            'taskbar_buttons': len(taskbar_buttons)
+            'taskbar_buttons': len(taskbar_buttons),
+            'ranges': {
+                'taskbar': [0, len(taskbar_buttons)],
+                'windows': [len(taskbar_buttons), len(all_elements)]
+            }
         }
         
         result = {
             'success': True,
             'summary': summary,
             'elements': all_elements,
-            'taskbar_icons': taskbar_buttons,
-            'windows': windows,
             'focused_window': focused_window
         }
         
         # Save to file (even if partial data)
-        with open('all_screen_elements.json', 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2)
+        with open('all_screen_elements.json', 'wb') as f:
+            f.write(dump_json(result, indent=True))
         
         # Print to stdout
-        print(json.dumps(result))
-        sys.stdout.flush()
+        print_json(result)
         
         return 0
         
@@ -481,19 +544,16 @@ def main():
                 'taskbar_buttons': 0
             },
             'elements': [],
-            'taskbar_icons': [],
-            'windows': [],
             'focused_window': None,
             'timeout': True,
             'error': str(e)
         }
         
         # Save partial results
-        with open('all_screen_elements.json', 'w', encoding='utf-8') as f:
-            json.dump(partial_result, f, indent=2)
+        with open('all_screen_elements.json', 'wb') as f:
+            f.write(dump_json(partial_result, indent=True))
         
-        print(json.dumps(partial_result))
-        sys.stdout.flush()
+        print_json(partial_result)
         return 0
         
     except Exception as e:
@@ -501,8 +561,7 @@ def main():
             'success': False,
             'error': str(e)
         }
-        print(json.dumps(error_result))
-        sys.stdout.flush()
+        print_json(error_result)
         return 1
 
 if __name__ == '__main__':
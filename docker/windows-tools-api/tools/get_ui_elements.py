@@ -8,18 +8,39 @@ import sys
 import json
 import ctypes
 from ctypes import wintypes, windll, byref, POINTER, c_void_p
-import comtypes
-import comtypes.client
+from concurrent.futures import ThreadPoolExecutor
+
+# Join the multithreaded apartment so UIA objects can be used from worker threads
+# (comtypes itself is imported lazily in init_ui_automation)
+sys.coinit_flags = 0  # COINIT_MULTITHREADED, read by comtypes on import
+
+# Generated UIAutomationClient module, cached after the first init_ui_automation
+UIA_CLIENT = None
+
+# Concurrent per-window subtree scans (each blocks on the target app's UI thread)
+SCAN_WORKERS = 8
+
+# Elements whose boxes match within this many pixels are treated as duplicates
+DEDUP_GRID = 4
+
+# Immutable UIA conditions and cache requests, see get_uia_queries
+UIA_QUERIES = None
 
 def init_ui_automation():
     """Initialize UI Automation"""
+    global UIA_CLIENT
     try:
+        import comtypes.client
+        
         # Generate type library if needed
-        try:
-            from comtypes.gen import UIAutomationClient
-        except ImportError:
-            comtypes.client.GetModule("UIAutomationCore.dll")
-            from comtypes.gen import UIAutomationClient
+        if UIA_CLIENT is None:
+            try:
+                from comtypes.gen import UIAutomationClient
+            except ImportError:
+                comtypes.client.GetModule("UIAutomationCore.dll")
+                from comtypes.gen import UIAutomationClient
+            UIA_CLIENT = UIAutomationClient
+        UIAutomationClient = UIA_CLIENT
         
         # Create UI Automation instance
         uia = comtypes.client.CreateObject(
@@ -32,80 +53,170 @@ def init_ui_automation():
         print(f"Failed to initialize UI Automation: {e}", file=sys.stderr)
         return None, None
 
+def collect_elements(found_elements, control_type_names):
+    """Build element dicts from a cached FindAll result"""
+    elements = []
+    
+    if not found_elements:
+        return elements
+    
+    for i in range(found_elements.Length):
+        try:
+            element = found_elements.GetElement(i)
+            control_type_id = element.CachedControlType
+            name = element.CachedName
+            rect = element.CachedBoundingRectangle
+            class_name = element.CachedClassName
+            automation_id = element.CachedAutomationId
+            
+            width = rect.right - rect.left
+            height = rect.bottom - rect.top
+            
+            # Skip invalid elements (too small or off-screen)
+            if width <= 0 or height <= 0 or width < 5 or height < 5:
+                continue
+            
+            # Skip elements far off screen
+            if rect.left < -10000 or rect.top < -10000:
+                continue
+            
+            elements.append({
+                'name': name or '',
+                'control_type': control_type_id,
+                'control_type_name': control_type_names.get(control_type_id, 'Unknown'),
+                'class_name': class_name or '',
+                'automation_id': automation_id or '',
+                'x': int(rect.left),
+                'y': int(rect.top),
+                'width': int(width),
+                'height': int(height),
+                'center_x': int((rect.left + rect.right) // 2),
+                'center_y': int((rect.top + rect.bottom) // 2)
+            })
+            
+        except Exception as e:
+            continue
+    
+    return elements
+
+def init_scan_worker():
+    """Enter the MTA on a scan worker thread"""
+    import comtypes
+    comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+
+def get_uia_queries(uia, UIAutomationClient):
+    """Conditions and cache requests for the element scan, built once per process"""
+    global UIA_QUERIES
+    if UIA_QUERIES is not None:
+        return UIA_QUERIES
+    
+    # Control types to search for (interactive elements)
+    control_types = [
+        (UIAutomationClient.UIA_ButtonControlTypeId, 'Button'),
+        (UIAutomationClient.UIA_EditControlTypeId, 'Edit'),
+        (UIAutomationClient.UIA_TextControlTypeId, 'Text'),
+        (UIAutomationClient.UIA_MenuItemControlTypeId, 'MenuItem'),
+        (UIAutomationClient.UIA_MenuBarControlTypeId, 'MenuBar'),
+        (UIAutomationClient.UIA_ListItemControlTypeId, 'ListItem'),
+        (UIAutomationClient.UIA_ComboBoxControlTypeId, 'ComboBox'),
+        (UIAutomationClient.UIA_CheckBoxControlTypeId, 'CheckBox'),
+        (UIAutomationClient.UIA_RadioButtonControlTypeId, 'RadioButton'),
+        (UIAutomationClient.UIA_TabItemControlTypeId, 'TabItem'),
+        (UIAutomationClient.UIA_HyperlinkControlTypeId, 'Hyperlink'),
+        (UIAutomationClient.UIA_ImageControlTypeId, 'Image'),
+    ]
+    
+    # One FindAll per window for all control types instead of one walk per type
+    conditions = [
+        uia.CreatePropertyCondition(UIAutomationClient.UIA_ControlTypePropertyId, control_type_id)
+        for control_type_id, _ in control_types
+    ]
+    condition = uia.CreateOrConditionFromArray(conditions)
+    
+    # Prefetch the properties we read in the same call instead of one RPC per property
+    cache_request = uia.CreateCacheRequest()
+    cache_request.AddProperty(UIAutomationClient.UIA_ControlTypePropertyId)
+    cache_request.AddProperty(UIAutomationClient.UIA_NamePropertyId)
+    cache_request.AddProperty(UIAutomationClient.UIA_BoundingRectanglePropertyId)
+    cache_request.AddProperty(UIAutomationClient.UIA_ClassNamePropertyId)
+    cache_request.AddProperty(UIAutomationClient.UIA_AutomationIdPropertyId)
+    cache_request.AutomationElementMode = UIAutomationClient.AutomationElementMode_None
+    
+    # Top-level windows only need their bounds to decide whether to walk them
+    window_request = uia.CreateCacheRequest()
+    window_request.AddProperty(UIAutomationClient.UIA_BoundingRectanglePropertyId)
+    
+    UIA_QUERIES = {
+        'control_type_names': dict(control_types),
+        'condition': condition,
+        'cache_request': cache_request,
+        'window_condition': uia.CreateTrueCondition(),
+        'window_request': window_request
+    }
+    return UIA_QUERIES
+
 def get_all_ui_elements(uia, UIAutomationClient):
     """Get all UI elements from the desktop using UI Automation"""
     try:
         # Get root element (desktop)
         root = uia.GetRootElement()
         
-        # Control types to search for (interactive elements)
-        control_types = [
-            (UIAutomationClient.UIA_ButtonControlTypeId, 'Button'),
-            (UIAutomationClient.UIA_EditControlTypeId, 'Edit'),
-            (UIAutomationClient.UIA_TextControlTypeId, 'Text'),
-            (UIAutomationClient.UIA_MenuItemControlTypeId, 'MenuItem'),
-            (UIAutomationClient.UIA_MenuBarControlTypeId, 'MenuBar'),
-            (UIAutomationClient.UIA_ListItemControlTypeId, 'ListItem'),
-            (UIAutomationClient.UIA_ComboBoxControlTypeId, 'ComboBox'),
-            (UIAutomationClient.UIA_CheckBoxControlTypeId, 'CheckBox'),
-            (UIAutomationClient.UIA_RadioButtonControlTypeId, 'RadioButton'),
-            (UIAutomationClient.UIA_TabItemControlTypeId, 'TabItem'),
-            (UIAutomationClient.UIA_HyperlinkControlTypeId, 'Hyperlink'),
-            (UIAutomationClient.UIA_ImageControlTypeId, 'Image'),
-        ]
+        queries = get_uia_queries(uia, UIAutomationClient)
+        control_type_names = queries['control_type_names']
+        condition = queries['condition']
+        cache_request = queries['cache_request']
         
         elements = []
         
-        # Search for each control type
-        for control_type_id, control_type_name in control_types:
+        windows = root.FindAllBuildCache(UIAutomationClient.TreeScope_Children, queries['window_condition'], queries['window_request'])
+        
+        visible_windows = []
+        if windows:
+            for i in range(windows.Length):
+                try:
+                    window = windows.GetElement(i)
+                    rect = window.CachedBoundingRectangle
+                    
+                    # Skip minimized and off-screen windows without walking their subtree
+                    if rect.right <= rect.left or rect.bottom <= rect.top:
+                        continue
+                    if rect.left < -10000 or rect.top < -10000:
+                        continue
+                    
+                    visible_windows.append(window)
+                    
+                except Exception as e:
+                    continue
+        
+        def scan_window(window):
             try:
-                condition = uia.CreatePropertyCondition(
-                    UIAutomationClient.UIA_ControlTypePropertyId,
-                    control_type_id
-                )
-                
-                # Find all elements of this type
-                found_elements = root.FindAll(UIAutomationClient.TreeScope_Descendants, condition)
-                
-                if found_elements:
-                    for i in range(found_elements.Length):
-                        try:
-                            element = found_elements.GetElement(i)
-                            name = element.CurrentName
-                            rect = element.CurrentBoundingRectangle
-                            class_name = element.CurrentClassName
-                            automation_id = element.CurrentAutomationId
-                            
-                            width = rect.right - rect.left
-                            height = rect.bottom - rect.top
-                            
-                            # Skip invalid elements (too small or off-screen)
-                            if width <= 0 or height <= 0 or width < 5 or height < 5:
-                                continue
-                            
-                            # Skip elements far off screen
-                            if rect.left < -10000 or rect.top < -10000:
-                                continue
-                            
-                            elements.append({
-                                'name': name or '',
-                                'control_type': control_type_id,
-                                'control_type_name': control_type_name,
-                                'class_name': class_name or '',
-                                'automation_id': automation_id or '',
-                                'x': int(rect.left),
-                                'y': int(rect.top),
-                                'width': int(width),
-                                'height': int(height),
-                                'center_x': int((rect.left + rect.right) // 2),
-                                'center_y': int((rect.top + rect.bottom) // 2)
-                            })
-                            
-                        except Exception as e:
-                            continue
-                            
+                found_elements = window.FindAllBuildCache(UIAutomationClient.TreeScope_Subtree, condition, cache_request)
+                return collect_elements(found_elements, control_type_names)
             except Exception as e:
-                continue
+                return []
+        
+        # Drop repeats of the same on-screen box (browsers report many nested copies)
+        seen_boxes = set()
+        seen_named = set()
+        
+        # Overlap the cross-process waits so one slow app doesn't stall the rest
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS, initializer=init_scan_worker) as executor:
+            for window_elements in executor.map(scan_window, visible_windows):
+                for element in window_elements:
+                    box = (element['x'] // DEDUP_GRID, element['y'] // DEDUP_GRID,
+                           element['width'] // DEDUP_GRID, element['height'] // DEDUP_GRID)
+                    box_key = box + (element['control_type'],)
+                    if box_key in seen_boxes:
+                        continue
+                    
+                    # Same box and name as an element already reported (e.g. the Text inside a Button)
+                    named_key = box + (element['name'],)
+                    if element['name'] and named_key in seen_named:
+                        continue
+                    
+                    seen_boxes.add(box_key)
+                    seen_named.add(named_key)
+                    elements.append(element)
         
         return elements
         
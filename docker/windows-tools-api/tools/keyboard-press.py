@@ -1,18 +1,142 @@
 #!/usr/bin/env python3
 """
 Windows Keyboard Press Tool
-Presses keyboard keys and key combinations using pyautogui
+Presses keyboard keys and key combinations using SendInput (ctypes)
 """
 
 import sys
 import json
 import argparse
+import functools
+import ctypes
+from ctypes import wintypes
 
-try:
-    import pyautogui
-    PYAUTOGUI_AVAILABLE = True
-except ImportError:
-    PYAUTOGUI_AVAILABLE = False
+SENDINPUT_AVAILABLE = sys.platform == 'win32'
+
+# SendInput structures
+INPUT_KEYBOARD = 1
+KEYEVENTF_EXTENDEDKEY = 0x0001
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+VK_SHIFT = 0x10
+VK_CONTROL = 0x11
+VK_MENU = 0x12
+
+# Key names (same set and spelling as pyautogui's Windows KEYBOARD_MAPPING) to virtual-key codes
+VK_CODES = {
+    'backspace': 0x08, '\b': 0x08, 'tab': 0x09, '\t': 0x09, 'clear': 0x0C,
+    'enter': 0x0D, 'return': 0x0D, '\n': 0x0D, '\r': 0x0D,
+    'shift': VK_SHIFT, 'ctrl': VK_CONTROL, 'control': VK_CONTROL, 'alt': VK_MENU,
+    'pause': 0x13, 'capslock': 0x14,
+    'kana': 0x15, 'hanguel': 0x15, 'hangul': 0x15, 'junja': 0x17, 'final': 0x18, 'hanja': 0x19, 'kanji': 0x19,
+    'esc': 0x1B, 'escape': 0x1B, 'convert': 0x1C, 'nonconvert': 0x1D, 'accept': 0x1E, 'modechange': 0x1F,
+    'space': 0x20, ' ': 0x20,
+    'pageup': 0x21, 'pgup': 0x21, 'pagedown': 0x22, 'pgdn': 0x22, 'end': 0x23, 'home': 0x24,
+    'left': 0x25, 'up': 0x26, 'right': 0x27, 'down': 0x28,
+    'select': 0x29, 'print': 0x2A, 'execute': 0x2B,
+    'printscreen': 0x2C, 'prtsc': 0x2C, 'prtscr': 0x2C, 'insert': 0x2D, 'delete': 0x2E, 'del': 0x2E, 'help': 0x2F,
+    'win': 0x5B, 'winleft': 0x5B, 'super': 0x5B, 'winright': 0x5C, 'apps': 0x5D, 'sleep': 0x5F,
+    'multiply': 0x6A, 'add': 0x6B, 'separator': 0x6C, 'subtract': 0x6D, 'decimal': 0x6E, 'divide': 0x6F,
+    'numlock': 0x90, 'scrolllock': 0x91,
+    'shiftleft': 0xA0, 'shiftright': 0xA1, 'ctrlleft': 0xA2, 'ctrlright': 0xA3, 'altleft': 0xA4, 'altright': 0xA5,
+    'browserback': 0xA6, 'browserforward': 0xA7, 'browserrefresh': 0xA8, 'browserstop': 0xA9,
+    'browsersearch': 0xAA, 'browserfavorites': 0xAB, 'browserhome': 0xAC,
+    'volumemute': 0xAD, 'volumedown': 0xAE, 'volumeup': 0xAF,
+    'nexttrack': 0xB0, 'prevtrack': 0xB1, 'stop': 0xB2, 'playpause': 0xB3,
+    'launchmail': 0xB4, 'launchmediaselect': 0xB5, 'launchapp1': 0xB6, 'launchapp2': 0xB7,
+}
+VK_CODES.update({f'num{n}': 0x60 + n for n in range(10)})
+VK_CODES.update({f'f{n}': 0x6F + n for n in range(1, 25)})
+
+# Keys that need KEYEVENTF_EXTENDEDKEY (otherwise the navigation keys arrive as numpad keys).
+# The numpad keys themselves (0x60-0x6F) are not extended.
+EXTENDED_KEYS = {0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x2C, 0x2D, 0x2E,
+                 0x5B, 0x5C, 0x5D, 0x90, 0xA3, 0xA5}
+EXTENDED_KEYS.update(range(0xA6, 0xB8))
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [('uMsg', wintypes.DWORD), ('wParamL', wintypes.WORD), ('wParamH', wintypes.WORD)]
+
+class INPUTUNION(ctypes.Union):
+    _fields_ = [('mi', MOUSEINPUT), ('ki', KEYBDINPUT), ('hi', HARDWAREINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [('type', wintypes.DWORD), ('union', INPUTUNION)]
+
+if SENDINPUT_AVAILABLE:
+    user32 = ctypes.WinDLL('user32', use_last_error=True)
+    user32.SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+    user32.SendInput.restype = wintypes.UINT
+    user32.VkKeyScanW.argtypes = (wintypes.WCHAR,)
+    user32.VkKeyScanW.restype = ctypes.c_short
+
+def resolve_key(name):
+    """Virtual-key codes to hold for one key name, modifiers first
+
+    Returns None for a character the keyboard layout can't produce.
+    """
+    lowered = name.lower()
+    if lowered in VK_CODES:
+        return (VK_CODES[lowered],)
+    if len(name) != 1:
+        raise ValueError(f'Unknown key: {name}')
+    scan = user32.VkKeyScanW(name)
+    if scan == -1:
+        return None
+    vks = []
+    if scan & 0x100:
+        vks.append(VK_SHIFT)
+    if scan & 0x200:
+        vks.append(VK_CONTROL)
+    if scan & 0x400:
+        vks.append(VK_MENU)
+    vks.append(scan & 0xFF)
+    return tuple(vks)
+
+def vk_event(vk, up=False):
+    flags = KEYEVENTF_KEYUP if up else 0
+    if vk in EXTENDED_KEYS:
+        flags |= KEYEVENTF_EXTENDEDKEY
+    return KEYBDINPUT(wVk=vk, dwFlags=flags)
+
+def key_events(key):
+    """Down events for every key in order, then up events in reverse"""
+    # A lone '+' is the plus key, not a separator
+    names = key.split('+') if key != '+' else ['+']
+    downs = []
+    ups = []
+    for name in names:
+        vks = resolve_key(name)
+        if vks is None:
+            # Not on the layout - send the character itself
+            unit = ord(name)
+            downs.append(KEYBDINPUT(wScan=unit, dwFlags=KEYEVENTF_UNICODE))
+            ups.append(KEYBDINPUT(wScan=unit, dwFlags=KEYEVENTF_UNICODE | KEYEVENTF_KEYUP))
+            continue
+        for vk in vks:
+            downs.append(vk_event(vk))
+            ups.append(vk_event(vk, up=True))
+    return downs + ups[::-1]
+
+@functools.lru_cache(maxsize=256)
+def hotkey_inputs(key):
+    """Prebuilt INPUT array for a key or combination (the same few hotkeys repeat)"""
+    events = key_events(key)
+    return (INPUT * len(events))(*(INPUT(type=INPUT_KEYBOARD, union=INPUTUNION(ki=event)) for event in events))
+
+def send_inputs(inputs):
+    """Send an INPUT array with a single SendInput call"""
+    sent = user32.SendInput(len(inputs), inputs, ctypes.sizeof(INPUT))
+    if sent != len(inputs):
+        raise ctypes.WinError(ctypes.get_last_error())
 
 def press_key(key):
     """
@@ -24,20 +148,16 @@ def press_key(key):
     Returns:
         dict: Result with success status
     """
-    if not PYAUTOGUI_AVAILABLE:
+    if not SENDINPUT_AVAILABLE:
         return {
             'success': False,
-            'error': 'pyautogui not installed',
-            'message': 'Failed to press key: pyautogui not installed'
+            'error': 'SendInput requires Windows',
+            'message': 'Failed to press key: SendInput requires Windows'
         }
     
     try:
-        # Handle key combinations (e.g., 'ctrl+c')
-        if '+' in key:
-            keys = key.split('+')
-            pyautogui.hotkey(*keys)
-        else:
-            pyautogui.press(key)
+        # Key combinations (e.g., 'ctrl+c') go out as one down/up sequence
+        send_inputs(hotkey_inputs(key))
         
         return {
             'success': True,
@@ -1,18 +1,66 @@
 #!/usr/bin/env python3
 """
 Windows Keyboard Type Tool
-Types text using pyautogui
+Types text using SendInput (ctypes)
 """
 
 import sys
 import json
 import argparse
+import time
+import ctypes
+from ctypes import wintypes
 
-try:
-    import pyautogui
-    PYAUTOGUI_AVAILABLE = True
-except ImportError:
-    PYAUTOGUI_AVAILABLE = False
+SENDINPUT_AVAILABLE = sys.platform == 'win32'
+
+# SendInput structures
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+VK_TAB = 0x09
+VK_RETURN = 0x0D
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [('uMsg', wintypes.DWORD), ('wParamL', wintypes.WORD), ('wParamH', wintypes.WORD)]
+
+class INPUTUNION(ctypes.Union):
+    _fields_ = [('mi', MOUSEINPUT), ('ki', KEYBDINPUT), ('hi', HARDWAREINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [('type', wintypes.DWORD), ('union', INPUTUNION)]
+
+if SENDINPUT_AVAILABLE:
+    user32 = ctypes.WinDLL('user32', use_last_error=True)
+    user32.SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+    user32.SendInput.restype = wintypes.UINT
+
+def char_events(char):
+    """Down/up events for one character: Enter/Tab as virtual keys, the rest as UTF-16 code units"""
+    if char in '\n\t':
+        vk = VK_RETURN if char == '\n' else VK_TAB
+        return [KEYBDINPUT(wVk=vk), KEYBDINPUT(wVk=vk, dwFlags=KEYEVENTF_KEYUP)]
+    events = []
+    encoded = char.encode('utf-16-le')
+    for i in range(0, len(encoded), 2):
+        unit = int.from_bytes(encoded[i:i + 2], 'little')
+        events.append(KEYBDINPUT(wScan=unit, dwFlags=KEYEVENTF_UNICODE))
+        events.append(KEYBDINPUT(wScan=unit, dwFlags=KEYEVENTF_UNICODE | KEYEVENTF_KEYUP))
+    return events
+
+def send_inputs(events):
+    """Send keyboard events with a single SendInput call"""
+    inputs = (INPUT * len(events))(*(INPUT(type=INPUT_KEYBOARD, union=INPUTUNION(ki=event)) for event in events))
+    sent = user32.SendInput(len(events), inputs, ctypes.sizeof(INPUT))
+    if sent != len(events):
+        raise ctypes.WinError(ctypes.get_last_error())
 
 def type_text(text, interval=0.05):
     """
@@ -25,15 +73,26 @@ def type_text(text, interval=0.05):
     Returns:
         dict: Result with success status
     """
-    if not PYAUTOGUI_AVAILABLE:
+    if not SENDINPUT_AVAILABLE:
         return {
             'success': False,
-            'error': 'pyautogui not installed',
-            'message': 'Failed to type text: pyautogui not installed'
+            'error': 'SendInput requires Windows',
+            'message': 'Failed to type text: SendInput requires Windows'
         }
     
     try:
-        pyautogui.write(text, interval=interval)
+        chars = text.replace('\r\n', '\n').replace('\r', '\n')
+        
+        if interval <= 0:
+            # No pacing - the whole string goes out in one SendInput call
+            events = [event for char in chars for event in char_events(char)]
+            if events:
+                send_inputs(events)
+        else:
+            for i, char in enumerate(chars):
+                if i:
+                    time.sleep(interval)
+                send_inputs(char_events(char))
         
         return {
             'success': True,
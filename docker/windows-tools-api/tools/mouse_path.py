@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Shared human-like mouse path generation
+Bundled as a helper script with mouse-move.py, mouse-click.py and mouse-scroll.py
+"""
+
+import sys
+import time
+import random
+import math
+import ctypes
+from ctypes import wintypes
+
+try:
+    import pyautogui
+    PYAUTOGUI_AVAILABLE = True
+except ImportError:
+    pyautogui = None
+    PYAUTOGUI_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# SendInput structures - the cursor path goes out as batches of absolute moves
+INPUT_MOUSE = 0
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_ABSOLUTE = 0x8000
+MOUSEEVENTF_VIRTUALDESK = 0x4000
+SM_XVIRTUALSCREEN = 76
+SM_YVIRTUALSCREEN = 77
+SM_CXVIRTUALSCREEN = 78
+SM_CYVIRTUALSCREEN = 79
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [('uMsg', wintypes.DWORD), ('wParamL', wintypes.WORD), ('wParamH', wintypes.WORD)]
+
+class INPUTUNION(ctypes.Union):
+    _fields_ = [('mi', MOUSEINPUT), ('ki', KEYBDINPUT), ('hi', HARDWAREINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [('type', wintypes.DWORD), ('union', INPUTUNION)]
+
+if sys.platform == 'win32':
+    user32 = ctypes.WinDLL('user32', use_last_error=True)
+    SendInput = user32.SendInput
+    SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+    SendInput.restype = wintypes.UINT
+    GetSystemMetrics = user32.GetSystemMetrics
+    GetSystemMetrics.argtypes = (ctypes.c_int,)
+    GetSystemMetrics.restype = ctypes.c_int
+else:
+    SendInput = None
+
+# Smallest useful pause between batches (default Windows timer tick)
+MIN_STEP_DURATION = 0.0156
+
+# Moves shorter than this (|dx|+|dy|) are skipped, or done straight instead of curved
+NO_OP_DISTANCE = 2
+STRAIGHT_MOVE_DISTANCE = 5
+
+# Path resolution used by glide_to, scaled with the move length
+MIN_PATH_POINTS = 5
+MAX_PATH_POINTS = 40
+PIXELS_PER_POINT = 30
+
+# Below this many points NumPy's per-call array setup costs more than the plain loop
+VECTORIZE_MIN_POINTS = 40
+
+def human_curve_path(start_x, start_y, end_x, end_y, num_points=20):
+    """
+    Generate a human-like curved path using Bezier curves with random control points
+    
+    Args:
+        start_x, start_y: Starting coordinates
+        end_x, end_y: Ending coordinates
+        num_points: Number of points along the curve
+    
+    Returns:
+        List of (x, y) tuples representing the path
+    """
+    dx = end_x - start_x
+    dy = end_y - start_y
+    
+    # Calculate distance for curve intensity
+    distance = math.hypot(dx, dy)
+    
+    # Control point offset (5-15% of distance, randomized)
+    offset_factor = random.uniform(0.05, 0.15)
+    max_offset = distance * offset_factor
+    
+    # Generate 2 random control points for a cubic Bezier curve
+    # Control points are offset perpendicular to the direct line
+    mid_x = (start_x + end_x) / 2
+    mid_y = (start_y + end_y) / 2
+    
+    # Unit perpendicular vector (rotated 90 degrees) - its length is distance
+    if distance > 0:
+        inv = 1.0 / distance
+        perp_x = -dy * inv
+        perp_y = dx * inv
+    else:
+        perp_x = perp_y = 0.0
+    
+    # Random offsets for control points
+    offset1 = random.uniform(-max_offset, max_offset)
+    offset2 = random.uniform(-max_offset, max_offset)
+    
+    # Control points positioned along the path with perpendicular offset
+    ox1, oy1 = perp_x * offset1, perp_y * offset1
+    ox2, oy2 = perp_x * offset2, perp_y * offset2
+    ctrl1_x = start_x + dx * 0.33 + ox1
+    ctrl1_y = start_y + dy * 0.33 + oy1
+    
+    ctrl2_x = start_x + dx * 0.66 + ox2
+    ctrl2_y = start_y + dy * 0.66 + oy2
+    
+    # Cubic Bezier in power basis: ((a*t + b)*t + c)*t + d, evaluated with Horner's scheme
+    ax = -start_x + 3 * ctrl1_x - 3 * ctrl2_x + end_x
+    bx = 3 * start_x - 6 * ctrl1_x + 3 * ctrl2_x
+    cx = -3 * start_x + 3 * ctrl1_x
+    ay = -start_y + 3 * ctrl1_y - 3 * ctrl2_y + end_y
+    by = 3 * start_y - 6 * ctrl1_y + 3 * ctrl2_y
+    cy = -3 * start_y + 3 * ctrl1_y
+    
+    # Evaluate all points of the curve at once
+    if NUMPY_AVAILABLE and num_points >= VECTORIZE_MIN_POINTS:
+        t = np.linspace(0.0, 1.0, num_points + 1)
+        xs = (((ax * t + bx) * t + cx) * t + start_x).astype(int)
+        ys = (((ay * t + by) * t + cy) * t + start_y).astype(int)
+        # Drop points that land on the same pixel as the previous one
+        keep = np.ones(len(xs), dtype=bool)
+        keep[1:] = (xs[1:] != xs[:-1]) | (ys[1:] != ys[:-1])
+        return list(zip(xs[keep].tolist(), ys[keep].tolist()))
+    
+    # Generate points along the cubic Bezier curve
+    points = []
+    for i in range(num_points + 1):
+        t = i / num_points
+        
+        x = ((ax * t + bx) * t + cx) * t + start_x
+        y = ((ay * t + by) * t + cy) * t + start_y
+        
+        # Skip points that land on the same pixel as the previous one
+        point = (int(x), int(y))
+        if not points or points[-1] != point:
+            points.append(point)
+    
+    return points
+
+def move_inputs(path):
+    """One absolute MOUSEEVENTF_MOVE per path point, normalized to the virtual desktop"""
+    left = GetSystemMetrics(SM_XVIRTUALSCREEN)
+    top = GetSystemMetrics(SM_YVIRTUALSCREEN)
+    width = max(GetSystemMetrics(SM_CXVIRTUALSCREEN) - 1, 1)
+    height = max(GetSystemMetrics(SM_CYVIRTUALSCREEN) - 1, 1)
+    flags = MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK
+    return [INPUT(type=INPUT_MOUSE, union=INPUTUNION(mi=MOUSEINPUT(
+                (point_x - left) * 65535 // width, (point_y - top) * 65535 // height, 0, flags, 0, 0)))
+            for point_x, point_y in path]
+
+def move_along(path, total_duration=0.3):
+    """Move the cursor through every point of path, spread over total_duration seconds"""
+    if SendInput is None:
+        point_duration = total_duration / len(path)
+        # Local for the hot loop
+        move_to = pyautogui.moveTo
+        for point_x, point_y in path:
+            move_to(point_x, point_y, duration=point_duration)
+        return
+    
+    # Group points into one SendInput batch per timer tick instead of one call per point
+    events = move_inputs(path)
+    steps = max(1, min(len(events), int(total_duration / MIN_STEP_DURATION)))
+    batches = []
+    for i in range(steps):
+        chunk = events[i * len(events) // steps:(i + 1) * len(events) // steps]
+        batches.append(((INPUT * len(chunk))(*chunk), len(chunk)))
+    
+    # Locals for the hot loop
+    send_input = SendInput
+    size = ctypes.sizeof(INPUT)
+    sleep = time.sleep
+    step_duration = total_duration / steps
+    for inputs, count in batches:
+        if send_input(count, inputs, size) != count:
+            raise ctypes.WinError(ctypes.get_last_error())
+        sleep(step_duration)
+
+def glide_to(x, y, total_duration=0.3):
+    """
+    Move the cursor from its current position to (x, y) along a human-like curve
+    
+    Returns:
+        The path that was followed (empty if the cursor was already there)
+    """
+    start_x, start_y = pyautogui.position()
+    
+    moved = abs(x - start_x) + abs(y - start_y)
+    
+    # Already there (or within a pixel) - nothing to animate
+    if moved < NO_OP_DISTANCE:
+        if moved:
+            pyautogui.moveTo(x, y, duration=0)
+        return []
+    
+    # Too short for a visible curve - one straight move
+    if moved < STRAIGHT_MOVE_DISTANCE:
+        pyautogui.moveTo(x, y, duration=0.05)
+        return [(x, y)]
+    
+    # More points for longer moves: fewer cursor updates on short hops, no stepping on long ones
+    num_points = max(MIN_PATH_POINTS, min(MAX_PATH_POINTS, int(math.hypot(x - start_x, y - start_y) / PIXELS_PER_POINT)))
+    
+    # Generate human-like curved path
+    path = human_curve_path(start_x, start_y, x, y, num_points)
+    
+    # Move along the curved path
+    move_along(path, total_duration)
+    
+    # Ensure we end exactly at the target
+    pyautogui.moveTo(x, y, duration=0)
+    return path
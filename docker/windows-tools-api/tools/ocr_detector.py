@@ -4,14 +4,83 @@ Simple Comprehensive OCR Text Detection
 Gets ALL text from screen with coordinates using basic tesseract
 """
 
+import os
+
+# Tesseract's OpenMP threads only add overhead on screenshots - must be set before it loads
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
 import pytesseract
 from PIL import Image
 import cv2
+import numpy as np
 import sys
 import json
+import itertools
+
+# tesserocr keeps tesseract loaded in-process (no tesseract.exe spawn per call)
+try:
+    from tesserocr import PyTessBaseAPI, PSM, OEM, RIL
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
 
 # Set Tesseract path for Windows
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+TESSDATA_PATH = r'C:\Program Files\Tesseract-OCR\tessdata'
+# tessdata_fast (integer LSTM models, far fewer MACs) is preferred when installed
+TESSDATA_FAST_PATH = r'C:\Program Files\Tesseract-OCR\tessdata_fast'
+TESSDATA_DIR = TESSDATA_FAST_PATH if os.path.isdir(TESSDATA_FAST_PATH) else TESSDATA_PATH
+if TESSDATA_DIR == TESSDATA_FAST_PATH:
+    # tesseract.exe (the pytesseract fallback) loads its models from here
+    os.environ.setdefault('TESSDATA_PREFIX', TESSDATA_FAST_PATH)
+
+# LSTM engine only, and no second pass over inverted text
+OCR_CONFIG = '--oem 1 --psm 3 -c tessedit_do_invert=0'
+
+TESS_API = None
+
+# Longest image side fed to tesseract (larger screenshots are downscaled)
+OCR_MAX_SIDE = 1600.0
+
+def get_tess_api():
+    """Create the tesserocr handle once and reuse it (None if unavailable)"""
+    global TESS_API, TESSEROCR_AVAILABLE
+    if TESS_API is None and TESSEROCR_AVAILABLE:
+        try:
+            # Same engine/page mode as OCR_CONFIG
+            if os.path.isdir(TESSDATA_DIR):
+                TESS_API = PyTessBaseAPI(path=TESSDATA_DIR, psm=PSM.AUTO, oem=OEM.LSTM_ONLY)
+            else:
+                TESS_API = PyTessBaseAPI(psm=PSM.AUTO, oem=OEM.LSTM_ONLY)
+            TESS_API.SetVariable('tessedit_do_invert', '0')
+        except Exception as e:
+            print(f"tesserocr unavailable, using pytesseract: {e}", file=sys.stderr)
+            TESSEROCR_AVAILABLE = False
+    return TESS_API
+
+def tesserocr_image_to_data(api, gray):
+    """Word-level results in the same dict layout as pytesseract.image_to_data"""
+    data = {'text': [], 'conf': [], 'left': [], 'top': [], 'width': [], 'height': []}
+    # Raw 8-bit buffer - SetImage(PIL) would round-trip the image through an in-memory BMP
+    height, width = gray.shape
+    api.SetImageBytes(np.ascontiguousarray(gray).tobytes(), width, height, 1, width)
+    api.Recognize()
+    ri = api.GetIterator()
+    if ri is None:
+        return data
+    while True:
+        box = ri.BoundingBox(RIL.WORD)
+        if box is not None:
+            x1, y1, x2, y2 = box
+            data['text'].append(ri.GetUTF8Text(RIL.WORD) or '')
+            data['conf'].append(ri.Confidence(RIL.WORD))
+            data['left'].append(x1)
+            data['top'].append(y1)
+            data['width'].append(x2 - x1)
+            data['height'].append(y2 - y1)
+        if not ri.Next(RIL.WORD):
+            break
+    return data
 
 def get_all_text_from_image(image_path):
     """
@@ -23,66 +92,74 @@ def get_all_text_from_image(image_path):
     Returns:
         List of text elements with positions
     """
-    try:
-        # Load image
-        image = cv2.imread(image_path)
-        if image is None:
-            print(f"Error: Could not load image from {image_path}", file=sys.stderr)
-            return []
+    # Decode straight to one channel (no BGR image + cvtColor)
+    gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        print(f"Error: Could not load image from {image_path}", file=sys.stderr)
+        return []
+    
+    return get_all_text_from_array(gray)
+
+def get_all_text_from_array(gray):
+    """
+    Get all text from an in-memory grayscale image (skips the file round-trip)
+    
+    Args:
+        gray: 2-D uint8 numpy array
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    Returns:
+        List of text elements with positions
+    """
+    try:
+        # Downscale large screenshots - OCR cost scales with pixel count
+        h, w = gray.shape
+        scale = min(1.0, OCR_MAX_SIDE / max(h, w))
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
         
         # Use only PSM 3 (fully automatic) for speed - it's the most reliable
-        custom_config = '--oem 3 --psm 3'
+        custom_config = OCR_CONFIG
         
-        # Get detailed data with timeout protection
-        data = pytesseract.image_to_data(
-            gray,
-            config=custom_config,
-            output_type=pytesseract.Output.DICT,
-            timeout=15  # 15 second timeout
-        )
+        api = get_tess_api()
+        if api is not None:
+            data = tesserocr_image_to_data(api, gray)
+        else:
+            # Get detailed data with timeout protection
+            data = pytesseract.image_to_data(
+                gray,
+                config=custom_config,
+                output_type=pytesseract.Output.DICT,
+                timeout=15  # 15 second timeout
+            )
         
-        # Parse results
-        elements = []
-        n_boxes = len(data['text'])
-        for i in range(n_boxes):
-            try:
-                conf = float(data['conf'][i])
-                text = data['text'][i].strip()
-                
-                # Skip low confidence or empty text
-                if conf < 30 or not text or len(text) < 1:
-                    continue
-                
-                x = data['left'][i]
-                y = data['top'][i]
-                w = data['width'][i]
-                h = data['height'][i]
-                
-                # Skip very small boxes
-                if w < 3 or h < 3:
-                    continue
-                
-                element = {
-                    'text': text,
-                    'confidence': conf / 100.0,
-                    'x': x,
-                    'y': y,
-                    'width': w,
-                    'height': h,
-                    'center_x': x + w // 2,
-                    'center_y': y + h // 2
-                }
-                
-                elements.append(element)
-            except (ValueError, KeyError) as e:
-                # Skip malformed entries
-                continue
+        # Parse results - filter and sort all boxes at once
+        texts = data['text']
+        conf = np.asarray(data['conf'], dtype=np.float32)
+        # Map back to full-resolution coordinates
+        left = (np.asarray(data['left'], dtype=np.float32) / scale).astype(np.int32)
+        top = (np.asarray(data['top'], dtype=np.float32) / scale).astype(np.int32)
+        width = (np.asarray(data['width'], dtype=np.float32) / scale).astype(np.int32)
+        height = (np.asarray(data['height'], dtype=np.float32) / scale).astype(np.int32)
         
+        # Skip empty text, low confidence and very small boxes - one combined mask
+        texts = [t.strip() if t else '' for t in texts]
+        nonempty = np.fromiter(map(bool, texts), dtype=bool, count=len(texts))
+        idx = np.flatnonzero(nonempty & (conf >= 30) & (width >= 3) & (height >= 3))
         # Sort by position (top to bottom, left to right)
-        elements.sort(key=lambda e: (e['y'], e['x']))
+        idx = idx[np.lexsort((left[idx], top[idx]))]
+        
+        elements = [{
+            'text': texts[i],
+            'text_lower': texts[i].lower(),
+            'confidence': c / 100.0,
+            'x': x,
+            'y': y,
+            'width': w,
+            'height': h,
+            'center_x': x + w // 2,
+            'center_y': y + h // 2
+        } for i, c, x, y, w, h in zip(idx.tolist(), conf[idx].tolist(), left[idx].tolist(),
+                                      top[idx].tolist(), width[idx].tolist(), height[idx].tolist())]
         
         return elements
         
@@ -90,67 +167,69 @@ def get_all_text_from_image(image_path):
         print(f"Error in OCR processing: {str(e)}", file=sys.stderr)
         return []
 
-def find_text_in_elements(elements, search_text, partial_match=True):
+def iter_matches(elements, search_text, partial_match=True):
     """
-    Find specific text in the detected elements
+    Yield elements matching the search text as they are found
     
     Args:
-        elements: List of text elements
+        elements: Iterable of text elements
         search_text: Text to search for
         partial_match: Whether to allow partial matches
-        
-    Returns:
-        List of matching elements
     """
-    matches = []
     search_lower = search_text.lower()
     
     for element in elements:
-        text_lower = element['text'].lower()
+        text_lower = element['text_lower']
         
         if partial_match:
             if search_lower in text_lower:
-                matches.append(element)
+                yield element
         else:
             if search_lower == text_lower:
-                matches.append(element)
+                yield element
+
+def find_text_in_elements(elements, search_text, partial_match=True):
+    """
+    Find specific text in the detected elements
     
-    return matches
+    Args:
+        elements: List of text elements
+        search_text: Text to search for
+        partial_match: Whether to allow partial matches
+        
+    Returns:
+        List of matching elements
+    """
+    return list(iter_matches(elements, search_text, partial_match))
+
+def format_elements(elements):
+    """Yield the MCP server compatible text block for each element"""
+    for i, element in enumerate(elements, 1):
+        yield (f"\n{i}. '{element['text']}'\n"
+               f"   Confidence: {element['confidence']:.2f}\n"
+               f"   Position: ({element['x']}, {element['y']})\n"
+               f"   Size: {element['width']}x{element['height']}\n"
+               f"   Center: ({element['center_x']}, {element['center_y']})\n")
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python ocr_detector.py <image_path> [search_text]")
+        print("Usage: python ocr_detector.py <image_path> [search_text] [max_matches]")
         sys.exit(1)
     
     image_path = sys.argv[1]
     search_text = sys.argv[2] if len(sys.argv) > 2 else None
+    max_matches = int(sys.argv[3]) if len(sys.argv) > 3 else None
     
     # Get all text elements
     elements = get_all_text_from_image(image_path)
     
     if search_text:
-        # Search for specific text
-        matches = find_text_in_elements(elements, search_text, partial_match=True)
-        
-        if matches:
-            print(f"Found {len(matches)} text elements:")
-            for i, match in enumerate(matches, 1):
-                print(f"\n{i}. '{match['text']}'")
-                print(f"   Confidence: {match['confidence']:.2f}")
-                print(f"   Position: ({match['x']}, {match['y']})")
-                print(f"   Size: {match['width']}x{match['height']}")
-                print(f"   Center: ({match['center_x']}, {match['center_y']})")
-        else:
-            print(f"Found 0 text elements:")
-    else:
-        # Show all detected text in MCP server compatible format
-        print(f"Found {len(elements)} text elements:")
-        for i, element in enumerate(elements, 1):
-            print(f"\n{i}. '{element['text']}'")
-            print(f"   Confidence: {element['confidence']:.2f}")
-            print(f"   Position: ({element['x']}, {element['y']})")
-            print(f"   Size: {element['width']}x{element['height']}")
-            print(f"   Center: ({element['center_x']}, {element['center_y']})")
+        # Search for specific text, stopping once max_matches are found
+        elements = list(itertools.islice(iter_matches(elements, search_text, partial_match=True), max_matches))
+    
+    # Show detected text in MCP server compatible format, one block at a time
+    print(f"Found {len(elements)} text elements:")
+    sys.stdout.writelines(format_elements(elements))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -9,18 +9,65 @@ import sys
 import json
 import argparse
 import os
-from pathlib import Path
+import threading
+import time
+import hashlib
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # ============================================================================
 # PIL/Pillow for screenshots
 # ============================================================================
 try:
-    from PIL import ImageGrab
+    from PIL import Image, ImageGrab
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
 
+# dxcam reads the frame through DXGI Desktop Duplication (no GDI BitBlt)
+try:
+    import dxcam
+    DXCAM_AVAILABLE = True
+except ImportError:
+    DXCAM_AVAILABLE = False
+
+# mss keeps its capture DC/DIBSection alive between grabs (faster than ImageGrab)
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+# orjson (C extension) for the --json output, much faster than json.dumps with indent
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def print_json(obj):
+    """Print obj as indented JSON
+    
+    orjson always emits raw UTF-8, so its bytes go straight to a UTF-8 binary stdout;
+    any other stdout (cp1252 pipe, StringIO) gets json.dumps' ASCII-escaped text as before.
+    """
+    if ORJSON_AVAILABLE:
+        buffer = getattr(sys.stdout, 'buffer', None)
+        encoding = (getattr(sys.stdout, 'encoding', None) or '').lower().replace('-', '').replace('_', '')
+        if buffer is not None and encoding == 'utf8':
+            try:
+                data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+            except TypeError:
+                data = None  # something orjson can't encode - let json have a go
+            if data is not None:
+                sys.stdout.flush()
+                buffer.write(data + b'\n')
+                buffer.flush()
+                return
+    print(json.dumps(obj, indent=2))
+
 # ============================================================================
 # PyAutoGUI for mouse position
 # ============================================================================
@@ -34,21 +81,37 @@ except ImportError:
 # Windows API imports (ctypes - built-in)
 # ============================================================================
 import ctypes
-from ctypes import wintypes, windll, byref, POINTER, Structure, c_int, c_uint, c_wchar
+from ctypes import wintypes, byref, POINTER, Structure, c_int, c_wchar
 
 # ============================================================================
 # UI Automation imports
 # ============================================================================
+# Join the multithreaded apartment so the cached UIA object works from any thread
+sys.coinit_flags = 0  # COINIT_MULTITHREADED, read by comtypes on import
 try:
     import comtypes
     import comtypes.client
     COMTYPES_AVAILABLE = True
+    # What a UIA call raises for stale, unsupported or NULL elements
+    UIA_ERRORS = (comtypes.COMError, AttributeError, TypeError, ValueError, OSError)
 except ImportError:
     COMTYPES_AVAILABLE = False
+    UIA_ERRORS = (AttributeError, TypeError, ValueError, OSError)
+
+# ============================================================================
+# NumPy (OCR post-processing)
+# ============================================================================
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 # ============================================================================
 # OCR imports
 # ============================================================================
+# Tesseract's OpenMP threads only add overhead on screenshots - must be set before it loads
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
 try:
     import pytesseract
     from PIL import Image
@@ -59,17 +122,42 @@ try:
 except ImportError:
     TESSERACT_AVAILABLE = False
 
+# tesserocr keeps tesseract loaded in-process (no tesseract.exe spawn per call)
+try:
+    from tesserocr import PyTessBaseAPI, PSM, OEM, RIL
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+TESSDATA_PATH = r'C:\Program Files\Tesseract-OCR\tessdata'
+# tessdata_fast (integer LSTM models, far fewer MACs) is preferred when installed
+TESSDATA_FAST_PATH = r'C:\Program Files\Tesseract-OCR\tessdata_fast'
+TESSDATA_DIR = TESSDATA_FAST_PATH if os.path.isdir(TESSDATA_FAST_PATH) else TESSDATA_PATH
+if TESSDATA_DIR == TESSDATA_FAST_PATH:
+    # tesseract.exe (the pytesseract fallback) loads its models from here
+    os.environ.setdefault('TESSDATA_PREFIX', TESSDATA_FAST_PATH)
+
+# LSTM engine only, and no second pass over inverted text
+OCR_CONFIG = '--oem 1 --psm 3 -c tessedit_do_invert=0'
+
 # Default screenshot directory
 SCREENSHOT_DIR = r'C:\Users\Docker\Pictures\MCP Screenshots'
 
+# PNG zlib level for saved screenshots (Pillow's default is 6)
+PNG_COMPRESS_LEVEL = 1
+# JPEG quality for --format jpeg (4:2:2 chroma keeps UI text edges readable)
+JPEG_QUALITY = 85
+
 # ============================================================================
 # Windows API Constants and Structures
 # ============================================================================
+GWL_STYLE = -16
 GWL_EXSTYLE = -20
+WS_VISIBLE = 0x10000000
+WS_MINIMIZE = 0x20000000
+WS_MAXIMIZE = 0x01000000
 WS_EX_TOOLWINDOW = 0x00000080
 WS_EX_APPWINDOW = 0x00040000
-SW_SHOWMAXIMIZED = 3
-SW_SHOWMINIMIZED = 2
 
 class RECT(Structure):
     _fields_ = [
@@ -79,18 +167,29 @@ class RECT(Structure):
         ('bottom', c_int)
     ]
 
-class WINDOWPLACEMENT(Structure):
+class GUITHREADINFO(Structure):
     _fields_ = [
-        ('length', c_uint),
-        ('flags', c_uint),
-        ('showCmd', c_uint),
-        ('ptMinPosition', wintypes.POINT),
-        ('ptMaxPosition', wintypes.POINT),
-        ('rcNormalPosition', RECT)
+        ('cbSize', wintypes.DWORD),
+        ('flags', wintypes.DWORD),
+        ('hwndActive', wintypes.HWND),
+        ('hwndFocus', wintypes.HWND),
+        ('hwndCapture', wintypes.HWND),
+        ('hwndMenuOwner', wintypes.HWND),
+        ('hwndMoveSize', wintypes.HWND),
+        ('hwndCaret', wintypes.HWND),
+        ('rcCaret', RECT)
     ]
 
-# Windows API functions
-user32 = windll.user32
+# Window titles longer than this are truncated
+TEXT_BUFFER_SIZE = 1024
+TEXT_TLS = threading.local()
+
+# Callback type
+EnumWindowsProc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+
+# Windows API functions - a private user32 handle so the prototypes below
+# don't leak into pyautogui's calls through the shared windll.user32
+user32 = ctypes.WinDLL('user32', use_last_error=True)
 EnumWindows = user32.EnumWindows
 EnumChildWindows = user32.EnumChildWindows
 GetWindowTextW = user32.GetWindowTextW
@@ -98,14 +197,64 @@ GetWindowTextLengthW = user32.GetWindowTextLengthW
 IsWindowVisible = user32.IsWindowVisible
 GetWindowRect = user32.GetWindowRect
 GetWindowLongW = user32.GetWindowLongW
-GetWindowPlacement = user32.GetWindowPlacement
 FindWindowW = user32.FindWindowW
 FindWindowExW = user32.FindWindowExW
 GetForegroundWindow = user32.GetForegroundWindow
 GetClassNameW = user32.GetClassNameW
+GetGUIThreadInfo = user32.GetGUIThreadInfo
 
-# Callback type
-EnumWindowsProc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+# Declared prototypes let ctypes skip argument type guessing on every call
+EnumWindows.argtypes = [EnumWindowsProc, wintypes.LPARAM]
+EnumWindows.restype = wintypes.BOOL
+EnumChildWindows.argtypes = [wintypes.HWND, EnumWindowsProc, wintypes.LPARAM]
+EnumChildWindows.restype = wintypes.BOOL
+GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, c_int]
+GetWindowTextW.restype = c_int
+GetWindowTextLengthW.argtypes = [wintypes.HWND]
+GetWindowTextLengthW.restype = c_int
+IsWindowVisible.argtypes = [wintypes.HWND]
+IsWindowVisible.restype = wintypes.BOOL
+GetWindowRect.argtypes = [wintypes.HWND, POINTER(RECT)]
+GetWindowRect.restype = wintypes.BOOL
+GetWindowLongW.argtypes = [wintypes.HWND, c_int]
+GetWindowLongW.restype = wintypes.LONG
+FindWindowW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR]
+FindWindowW.restype = wintypes.HWND
+FindWindowExW.argtypes = [wintypes.HWND, wintypes.HWND, wintypes.LPCWSTR, wintypes.LPCWSTR]
+FindWindowExW.restype = wintypes.HWND
+GetForegroundWindow.argtypes = []
+GetForegroundWindow.restype = wintypes.HWND
+GetClassNameW.argtypes = [wintypes.HWND, wintypes.LPWSTR, c_int]
+GetClassNameW.restype = c_int
+GetGUIThreadInfo.argtypes = [wintypes.DWORD, POINTER(GUITHREADINFO)]
+GetGUIThreadInfo.restype = wintypes.BOOL
+
+# 64-bit user32 exports GetWindowLongPtrW; on 32-bit it is just GetWindowLongW
+if hasattr(user32, 'GetWindowLongPtrW'):
+    GetWindowLongPtrW = user32.GetWindowLongPtrW
+    GetWindowLongPtrW.argtypes = [wintypes.HWND, c_int]
+    GetWindowLongPtrW.restype = ctypes.c_ssize_t
+else:
+    GetWindowLongPtrW = GetWindowLongW
+
+def _collect_hwnd(hwnd, lParam):
+    """Append an enumerated hwnd to the list passed by address through lParam"""
+    ctypes.cast(lParam, POINTER(ctypes.py_object)).contents.value.append(hwnd)
+    return True
+
+# One trampoline shared by every enumeration; it only collects handles, the
+# per-window filtering runs afterwards as a plain loop outside the callback
+_collect_hwnd_proc = EnumWindowsProc(_collect_hwnd)
+
+def list_windows(parent=None):
+    """Handles of all top-level windows, or of all children of parent"""
+    hwnds = []
+    ref = ctypes.py_object(hwnds)
+    if parent:
+        EnumChildWindows(parent, _collect_hwnd_proc, ctypes.addressof(ref))
+    else:
+        EnumWindows(_collect_hwnd_proc, ctypes.addressof(ref))
+    return hwnds
 
 # ============================================================================
 # MOUSE POSITION (embedded from mouse-position.py)
@@ -124,20 +273,20 @@ def get_mouse_position():
 # ============================================================================
 # WINDOWS API FUNCTIONS (embedded from get_all_screen_elements_api.py)
 # ============================================================================
-def get_window_text(hwnd):
-    """Get window title text"""
+def get_window_text(hwnd, _GetWindowTextW=GetWindowTextW):
+    """Get window title text (API calls bound as default args for fast local access)"""
     try:
-        length = GetWindowTextLengthW(hwnd)
-        if length == 0:
-            return ""
-        buff = ctypes.create_unicode_buffer(length + 1)
-        GetWindowTextW(hwnd, buff, length + 1)
-        return buff.value
+        # One scratch buffer per thread, no GetWindowTextLengthW round-trip
+        buff = getattr(TEXT_TLS, 'buff', None)
+        if buff is None:
+            buff = TEXT_TLS.buff = ctypes.create_unicode_buffer(TEXT_BUFFER_SIZE)
+        length = _GetWindowTextW(hwnd, buff, TEXT_BUFFER_SIZE)
+        return buff[:length]
     except:
         return ""
 
-def get_taskbar_buttons():
-    """Get all taskbar button information using Windows API"""
+def get_taskbar_buttons(windows=None):
+    """Get all taskbar button information using Windows API (windows: from enumerate_app_windows)"""
     taskbar_buttons = []
     
     try:
@@ -155,47 +304,12 @@ def get_taskbar_buttons():
         taskbar_y = taskbar_rect.top
         screen_width = taskbar_rect.right - taskbar_rect.left
         
-        # Get all windows that would have taskbar buttons
-        windows_with_buttons = []
-        
-        def enum_callback(hwnd, lParam):
-            if IsWindowVisible(hwnd):
-                try:
-                    text = get_window_text(hwnd)
-                    if not text:
-                        return True
-                    
-                    ex_style = GetWindowLongW(hwnd, GWL_EXSTYLE)
-                    if (ex_style & WS_EX_TOOLWINDOW) and not (ex_style & WS_EX_APPWINDOW):
-                        return True
-                    
-                    rect = RECT()
-                    if not GetWindowRect(hwnd, byref(rect)):
-                        return True
-                    
-                    width = rect.right - rect.left
-                    height = rect.bottom - rect.top
-                    
-                    if width < 10 or height < 10:
-                        return True
-                    
-                    placement = WINDOWPLACEMENT()
-                    placement.length = ctypes.sizeof(WINDOWPLACEMENT)
-                    is_minimized = False
-                    
-                    if GetWindowPlacement(hwnd, byref(placement)):
-                        is_minimized = placement.showCmd == SW_SHOWMINIMIZED
-                    
-                    if is_minimized:
-                        return True
-                    
-                    windows_with_buttons.append({'name': text, 'hwnd': hwnd})
-                except:
-                    pass
-            return True
+        if windows is None:
+            windows = enumerate_app_windows()
         
-        callback = EnumWindowsProc(enum_callback)
-        EnumWindows(callback, 0)
+        # Get all windows that would have taskbar buttons (minimized ones are skipped)
+        windows_with_buttons = [{'name': window['text'], 'hwnd': window['hwnd']}
+                                for window in windows if not window['is_minimized']]
         
         # Calculate button positions
         button_width = 44
@@ -253,15 +367,16 @@ def get_taskbar_buttons():
             if GetWindowRect(tray_notify, byref(tray_rect)):
                 tray_icons = []
                 
-                def enum_tray(hwnd, lParam):
+                def enum_tray(hwnd, lParam, _GetClassNameW=GetClassNameW, _IsWindowVisible=IsWindowVisible,
+                              _GetWindowRect=GetWindowRect):
                     try:
                         class_name = ctypes.create_unicode_buffer(256)
-                        GetClassNameW(hwnd, class_name, 256)
+                        _GetClassNameW(hwnd, class_name, 256)
                         text = get_window_text(hwnd)
                         
-                        if IsWindowVisible(hwnd):
+                        if _IsWindowVisible(hwnd):
                             rect = RECT()
-                            if GetWindowRect(hwnd, byref(rect)):
+                            if _GetWindowRect(hwnd, byref(rect)):
                                 width = rect.right - rect.left
                                 height = rect.bottom - rect.top
                                 
@@ -282,8 +397,8 @@ def get_taskbar_buttons():
                         pass
                     return True
                 
-                tray_callback = EnumWindowsProc(enum_tray)
-                EnumChildWindows(tray_notify, tray_callback, 0)
+                for hwnd in list_windows(tray_notify):
+                    enum_tray(hwnd, 0)
                 taskbar_buttons.extend(tray_icons)
         
         # Add notification button
@@ -305,23 +420,37 @@ def get_taskbar_buttons():
     
     return taskbar_buttons
 
-def get_all_windows():
-    """Get all visible windows"""
-    windows = []
+def make_app_window_filter(out, _GetWindowLongPtrW=GetWindowLongPtrW, _GetWindowRect=GetWindowRect,
+                           _GetWindowTextW=GetWindowTextW, _RECT=RECT, _byref=byref,
+                           _GWL_STYLE=GWL_STYLE, _GWL_EXSTYLE=GWL_EXSTYLE, _WS_VISIBLE=WS_VISIBLE,
+                           _WS_MINIMIZE=WS_MINIMIZE, _WS_MAXIMIZE=WS_MAXIMIZE,
+                           _WS_EX_TOOLWINDOW=WS_EX_TOOLWINDOW, _WS_EX_APPWINDOW=WS_EX_APPWINDOW,
+                           _BUFFER_SIZE=TEXT_BUFFER_SIZE):
+    """Build the per-window filter for enumerate_app_windows
+    
+    Every API function and constant is bound as a default arg here and closed
+    over by the filter, so the hot loop resolves no globals at all.
+    """
+    append = out.append
+    buff = ctypes.create_unicode_buffer(_BUFFER_SIZE)
     
     def enum_callback(hwnd, lParam):
-        if IsWindowVisible(hwnd):
+        # Top-level windows have no parent to hide them, so the WS_VISIBLE bit
+        # is what IsWindowVisible would report
+        style = _GetWindowLongPtrW(hwnd, _GWL_STYLE)
+        if style & _WS_VISIBLE:
             try:
-                text = get_window_text(hwnd)
-                if not text:
+                # Style bits first, they are cheaper than fetching the title
+                ex_style = _GetWindowLongPtrW(hwnd, _GWL_EXSTYLE)
+                if (ex_style & _WS_EX_TOOLWINDOW) and not (ex_style & _WS_EX_APPWINDOW):
                     return True
                 
-                ex_style = GetWindowLongW(hwnd, GWL_EXSTYLE)
-                if (ex_style & WS_EX_TOOLWINDOW) and not (ex_style & WS_EX_APPWINDOW):
+                text = buff[:_GetWindowTextW(hwnd, buff, _BUFFER_SIZE)]
+                if not text:
                     return True
                 
-                rect = RECT()
-                if not GetWindowRect(hwnd, byref(rect)):
+                rect = _RECT()
+                if not _GetWindowRect(hwnd, _byref(rect)):
                     return True
                 
                 width = rect.right - rect.left
@@ -330,35 +459,49 @@ def get_all_windows():
                 if width < 10 or height < 10:
                     return True
                 
-                placement = WINDOWPLACEMENT()
-                placement.length = ctypes.sizeof(WINDOWPLACEMENT)
-                is_maximized = False
-                is_minimized = False
-                
-                if GetWindowPlacement(hwnd, byref(placement)):
-                    is_maximized = placement.showCmd == SW_SHOWMAXIMIZED
-                    is_minimized = placement.showCmd == SW_SHOWMINIMIZED
-                
-                windows.append({
-                    'name': text,
-                    'type': 'Window',
-                    'x': rect.left,
-                    'y': rect.top,
-                    'width': width,
-                    'height': height,
-                    'center_x': (rect.left + rect.right) // 2,
-                    'center_y': (rect.top + rect.bottom) // 2,
-                    'is_maximized': is_maximized,
-                    'is_minimized': is_minimized
+                append({
+                    'hwnd': hwnd,
+                    'text': text,
+                    'rect': rect,
+                    # Same bits IsZoomed/IsIconic read, already in hand
+                    'is_maximized': bool(style & _WS_MAXIMIZE),
+                    'is_minimized': bool(style & _WS_MINIMIZE)
                 })
             except:
                 pass
         return True
     
-    callback = EnumWindowsProc(enum_callback)
-    EnumWindows(callback, 0)
+    return enum_callback
+
+def enumerate_app_windows():
+    """Enumerate visible, titled, non-tool top-level windows once
+    
+    Both get_taskbar_buttons and get_all_windows are derived from this list.
+    """
+    windows = []
+    enum_callback = make_app_window_filter(windows)
+    for hwnd in list_windows():
+        enum_callback(hwnd, 0)
     return windows
 
+def get_all_windows(windows=None):
+    """Get all visible windows (windows: from enumerate_app_windows)"""
+    if windows is None:
+        windows = enumerate_app_windows()
+    
+    return [{
+        'name': window['text'],
+        'type': 'Window',
+        'x': window['rect'].left,
+        'y': window['rect'].top,
+        'width': window['rect'].right - window['rect'].left,
+        'height': window['rect'].bottom - window['rect'].top,
+        'center_x': (window['rect'].left + window['rect'].right) // 2,
+        'center_y': (window['rect'].top + window['rect'].bottom) // 2,
+        'is_maximized': window['is_maximized'],
+        'is_minimized': window['is_minimized']
+    } for window in windows]
+
 def get_focused_window():
     """Get currently focused window"""
     try:
@@ -384,12 +527,15 @@ def get_all_screen_elements():
         import time
         start_time = time.time()
         
-        taskbar_buttons = get_taskbar_buttons()
+        # One EnumWindows pass feeds both the taskbar buttons and the window list
+        app_windows = enumerate_app_windows()
+        
+        taskbar_buttons = get_taskbar_buttons(app_windows)
         
         if time.time() - start_time > 5:
             raise TimeoutError("Execution taking too long")
         
-        windows = get_all_windows()
+        windows = get_all_windows(app_windows)
         
         if time.time() - start_time > 7:
             raise TimeoutError("Execution taking too long")
@@ -420,81 +566,328 @@ def get_all_screen_elements():
 # ============================================================================
 # UI AUTOMATION (embedded from get_ui_elements.py)
 # ============================================================================
+# Element properties prefetched by the UIA cache request (read with cached_value)
+UIA_CACHED_PROPERTIES = (
+    'UIA_NamePropertyId', 'UIA_ControlTypePropertyId', 'UIA_BoundingRectanglePropertyId',
+    'UIA_ClassNamePropertyId', 'UIA_AutomationIdPropertyId', 'UIA_HelpTextPropertyId',
+    'UIA_FullDescriptionPropertyId', 'UIA_AcceleratorKeyPropertyId', 'UIA_AccessKeyPropertyId',
+    'UIA_ItemTypePropertyId', 'UIA_NativeWindowHandlePropertyId'
+)
+
+def cached_value(element, property_id, default=''):
+    """Value of a property prefetched by the cache request (default when empty or unavailable)"""
+    try:
+        value = element.GetCachedPropertyValue(property_id)
+    except UIA_ERRORS:
+        return default
+    return default if value is None or value == '' else value
+
+# ----------------------------------------------------------------------------
+# Name extraction methods for unnamed UIA elements
+# Each takes (element, rect, control_type, uia, UIAutomationClient, text_elements_map)
+# and returns a name or ''
+# ----------------------------------------------------------------------------
+def name_from_legacy(element, rect, control_type, uia, UIAutomationClient, text_elements_map):
+    """Method 2: LegacyIAccessible pattern (often has names when CurrentName doesn't)"""
+    try:
+        legacy_pattern = element.GetCurrentPattern(UIAutomationClient.UIA_LegacyIAccessiblePatternId)
+        if legacy_pattern:
+            return legacy_pattern.CurrentName or ''
+    except UIA_ERRORS:
+        pass
+    return ''
+
+def name_from_window_text(element, rect, control_type, uia, UIAutomationClient, text_elements_map):
+    """Method 3: Win32 GetWindowText (only works for elements with a native window handle)"""
+    try:
+        hwnd = cached_value(element, UIAutomationClient.UIA_NativeWindowHandlePropertyId, 0)
+        if hwnd:
+            return get_window_text(hwnd)
+    except UIA_ERRORS:
+        pass
+    return ''
+
+def name_from_value(element, rect, control_type, uia, UIAutomationClient, text_elements_map):
+    """Method 4: Value pattern"""
+    try:
+        value_pattern = element.GetCurrentPattern(UIAutomationClient.UIA_ValuePatternId)
+        if value_pattern:
+            return value_pattern.CurrentValue or ''
+    except UIA_ERRORS:
+        pass
+    return ''
+
+def name_from_text_pattern(element, rect, control_type, uia, UIAutomationClient, text_elements_map):
+    """Method 5: Text pattern"""
+    try:
+        text_pattern = element.GetCurrentPattern(UIAutomationClient.UIA_TextPatternId)
+        if text_pattern:
+            doc_range = text_pattern.DocumentRange
+            if doc_range:
+                return doc_range.GetText(-1) or ''
+    except UIA_ERRORS:
+        pass
+    return ''
+
+def name_from_child_text(element, rect, control_type, uia, UIAutomationClient, text_elements_map):
+    """Method 6: Child Text elements"""
+    try:
+        text_condition = uia.CreatePropertyCondition(
+            UIAutomationClient.UIA_ControlTypePropertyId,
+            UIAutomationClient.UIA_TextControlTypeId
+        )
+        child_texts = element.FindAll(UIAutomationClient.TreeScope_Children, text_condition)
+        if child_texts and child_texts.Length > 0:
+            child_names = []
+            for j in range(min(child_texts.Length, 3)):
+                try:
+                    child = child_texts.GetElement(j)
+                    child_name = child.CurrentName or ''
+                    if child_name:
+                        child_names.append(child_name)
+                except UIA_ERRORS:
+                    pass
+            return ' '.join(child_names)
+    except UIA_ERRORS:
+        pass
+    return ''
+
+def name_from_nearby_text(element, rect, control_type, uia, UIAutomationClient, text_elements_map):
+    """Method 7: Nearby Text elements (up to 70px right, 15px above/below)"""
+    left, top = int(rect.left), int(rect.top)
+    best = None
+    for cell_x in range(left // NEARBY_TEXT_CELL_X, (left + 70) // NEARBY_TEXT_CELL_X + 1):
+        for cell_y in range((top - 15) // NEARBY_TEXT_CELL_Y, (top + 15) // NEARBY_TEXT_CELL_Y + 1):
+            for text_left, text_top, text in text_elements_map.get((cell_x, cell_y), ()):
+                dx = text_left - left
+                dy = abs(text_top - top)
+                # Closest horizontally first, then vertically
+                if 0 <= dx <= 70 and dy <= 15 and (best is None or (dx, dy) < best[:2]):
+                    best = (dx, dy, text)
+    return best[2] if best else ''
+
+def name_from_parent(element, rect, control_type, uia, UIAutomationClient, text_elements_map):
+    """Method 8: Parent element name (for items inside named containers)"""
+    try:
+        parent = uia.ControlViewWalker.GetParentElement(element)
+        if parent:
+            parent_name = parent.CurrentName or ''
+            if parent_name and len(parent_name) < 100:  # Avoid huge parent names
+                return f"{parent_name} item"
+    except UIA_ERRORS:
+        pass
+    return ''
+
+def name_from_tooltip(element, rect, control_type, uia, UIAutomationClient, text_elements_map):
+    """Method 9: Help text (some elements have tooltips that contain their names)"""
+    try:
+        tooltip = cached_value(element, UIAutomationClient.UIA_HelpTextPropertyId)
+        if len(tooltip) < 50:
+            return tooltip
+    except UIA_ERRORS:
+        pass
+    return ''
+
+def name_from_sibling_image(element, rect, control_type, uia, UIAutomationClient, text_elements_map):
+    """Method 10: Sibling Image elements near this one (icons often have names)"""
+    try:
+        parent = uia.ControlViewWalker.GetParentElement(element)
+        if parent:
+            image_condition = uia.CreatePropertyCondition(
+                UIAutomationClient.UIA_ControlTypePropertyId,
+                UIAutomationClient.UIA_ImageControlTypeId
+            )
+            images = parent.FindAll(UIAutomationClient.TreeScope_Children, image_condition)
+            if images and images.Length > 0:
+                for k in range(images.Length):
+                    try:
+                        img = images.GetElement(k)
+                        img_name = img.CurrentName or ''
+                        if img_name:
+                            # Check if image is near this element
+                            img_rect = img.CurrentBoundingRectangle
+                            if abs(img_rect.top - rect.top) < 50:
+                                return img_name
+                    except UIA_ERRORS:
+                        pass
+    except UIA_ERRORS:
+        pass
+    return ''
+
+# Control types that can expose each optional method
+VALUE_PATTERN_TYPES = {50003, 50004, 50005, 50007, 50012, 50015, 50016, 50024, 50025, 50029, 50030}  # ComboBox, Edit, Hyperlink, ListItem, ProgressBar, Slider, Spinner, TreeItem, Custom, DataItem, Document
+TEXT_PATTERN_TYPES = {50004, 50020, 50025, 50030}  # Edit, Text, Custom, Document
+CHILDLESS_TYPES = {50004, 50006, 50012, 50014, 50015, 50020, 50027, 50038}  # Edit, Image, ProgressBar, ScrollBar, Slider, Text, Thumb, Separator
+PARENT_NAME_TYPES = {50000, 50007, 50011}  # Button, ListItem, MenuItem
+SIBLING_IMAGE_TYPES = {50011}  # MenuItem
+
+def name_methods_for(control_type):
+    """Ordered name extraction methods worth trying for a control type"""
+    known = 50000 <= control_type <= 50038
+    methods = [name_from_legacy, name_from_window_text]
+    if not known or control_type in VALUE_PATTERN_TYPES:
+        methods.append(name_from_value)
+    if not known or control_type in TEXT_PATTERN_TYPES:
+        methods.append(name_from_text_pattern)
+    if not known or control_type not in CHILDLESS_TYPES:
+        methods.append(name_from_child_text)
+    methods.append(name_from_nearby_text)
+    if control_type in PARENT_NAME_TYPES:
+        methods.append(name_from_parent)
+    methods.append(name_from_tooltip)
+    if control_type in SIBLING_IMAGE_TYPES:
+        methods.append(name_from_sibling_image)
+    return tuple(methods)
+
+# Dispatch table: control type -> name extraction methods, built once at import
+NAME_METHODS = {control_type: name_methods_for(control_type) for control_type in range(50000, 50039)}
+NAME_METHODS_DEFAULT = name_methods_for(0)
+
+# (result key, cached property) read for every element after name extraction
+UIA_EXTRA_PROPERTIES = (
+    ('class_name', 'UIA_ClassNamePropertyId'), ('automation_id', 'UIA_AutomationIdPropertyId'),
+    ('help_text', 'UIA_HelpTextPropertyId'), ('full_description', 'UIA_FullDescriptionPropertyId'),
+    ('accelerator_key', 'UIA_AcceleratorKeyPropertyId'), ('access_key', 'UIA_AccessKeyPropertyId'),
+    ('item_type', 'UIA_ItemTypePropertyId')
+)
+
+# Grid cell size for the nearby-text lookup; a 70x30px search window touches at most 2x2 cells
+NEARBY_TEXT_CELL_X = 80
+NEARBY_TEXT_CELL_Y = 32
+
+# UIA control type names, indexed by control type id - 50000 (ids are contiguous)
+CONTROL_TYPE_NAMES = (
+    "Button", "Calendar", "CheckBox", "ComboBox", "Edit", "Hyperlink", "Image", "ListItem",
+    "List", "Menu", "MenuBar", "MenuItem", "ProgressBar", "RadioButton", "ScrollBar", "Slider",
+    "Spinner", "StatusBar", "Tab", "TabItem", "Text", "ToolBar", "ToolTip", "Tree",
+    "TreeItem", "Custom", "Group", "Thumb", "DataGrid", "DataItem", "Document", "SplitButton",
+    "Window", "Pane", "Header", "HeaderItem", "Table", "TitleBar", "Separator"
+)
+
+def control_type_name(control_type):
+    """Readable name for a UIA control type id"""
+    if 50000 <= control_type <= 50038:
+        return CONTROL_TYPE_NAMES[control_type - 50000]
+    return f"Type_{control_type}"
+
+# Keys of each element dict returned by get_all_ui_elements, in row order
+UI_ELEMENT_FIELDS = (
+    'name', 'original_name', 'help_text', 'full_description', 'accelerator_key',
+    'access_key', 'item_type', 'control_type', 'control_type_name', 'class_name',
+    'automation_id', 'x', 'y', 'width', 'height', 'center_x', 'center_y'
+)
+
+# (uia, UIAutomationClient), created once per process by init_ui_automation
+UIA_CACHE = None
+UIA_LOCK = threading.Lock()
+
 def init_ui_automation():
-    """Initialize UI Automation"""
+    """Initialize UI Automation (the instance is created once and reused)"""
+    global UIA_CACHE
     if not COMTYPES_AVAILABLE:
         return None, None
     
-    try:
+    with UIA_LOCK:
+        if UIA_CACHE is not None:
+            return UIA_CACHE
         try:
-            from comtypes.gen import UIAutomationClient
-        except ImportError:
-            comtypes.client.GetModule("UIAutomationCore.dll")
-            from comtypes.gen import UIAutomationClient
-        
-        uia = comtypes.client.CreateObject(
-            "{ff48dba4-60ef-4201-aa87-54103eef594e}",
-            interface=UIAutomationClient.IUIAutomation
-        )
-        
-        return uia, UIAutomationClient
-    except:
-        return None, None
+            try:
+                from comtypes.gen import UIAutomationClient
+            except ImportError:
+                comtypes.client.GetModule("UIAutomationCore.dll")
+                from comtypes.gen import UIAutomationClient
+            
+            uia = comtypes.client.CreateObject(
+                "{ff48dba4-60ef-4201-aa87-54103eef594e}",
+                interface=UIAutomationClient.IUIAutomation
+            )
+            
+            UIA_CACHE = (uia, UIAutomationClient)
+            return UIA_CACHE
+        except Exception:
+            return None, None
 
 def get_all_ui_elements(uia, UIAutomationClient):
     """Get ALL UI elements from desktop - using both UI Automation AND Win32 API"""
     try:
         root = uia.GetRootElement()
         
-        # Control type names mapping
-        control_type_names = {
-            50000: "Button", 50001: "Calendar", 50002: "CheckBox", 50003: "ComboBox",
-            50004: "Edit", 50005: "Hyperlink", 50006: "Image", 50007: "ListItem",
-            50008: "List", 50009: "Menu", 50010: "MenuBar", 50011: "MenuItem",
-            50012: "ProgressBar", 50013: "RadioButton", 50014: "ScrollBar", 50015: "Slider",
-            50016: "Spinner", 50017: "StatusBar", 50018: "Tab", 50019: "TabItem",
-            50020: "Text", 50021: "ToolBar", 50022: "ToolTip", 50023: "Tree",
-            50024: "TreeItem", 50025: "Custom", 50026: "Group", 50027: "Thumb",
-            50028: "DataGrid", 50029: "DataItem", 50030: "Document", 50031: "SplitButton",
-            50032: "Window", 50033: "Pane", 50034: "Header", 50035: "HeaderItem",
-            50036: "Table", 50037: "TitleBar", 50038: "Separator"
-        }
-        
         elements = []
         processed = set()
-        text_elements_map = {}  # Map positions to text content
+        text_elements_map = {}  # Spatial grid cell -> [(left, top, text)] of Text elements
         
         # Get ALL elements using a TrueCondition
         try:
             true_condition = uia.CreateTrueCondition()
-            all_elements = root.FindAll(UIAutomationClient.TreeScope_Descendants, true_condition)
             
-            # First pass: collect all Text elements
-            if all_elements:
+            # Fetch every property read below together with the elements, in one cross-process
+            # call, instead of one round trip per property per element
+            cache_request = uia.CreateCacheRequest()
+            for property_name in UIA_CACHED_PROPERTIES:
+                property_id = getattr(UIAutomationClient, property_name, None)
+                if property_id is not None:
+                    cache_request.AddProperty(property_id)
+            
+            # Top-level windows first, so offscreen/minimized windows are pruned with their whole subtree
+            window_request = uia.CreateCacheRequest()
+            window_request.AddProperty(UIAutomationClient.UIA_BoundingRectanglePropertyId)
+            window_request.AddProperty(UIAutomationClient.UIA_IsOffscreenPropertyId)
+            windows = root.FindAllBuildCache(UIAutomationClient.TreeScope_Children, true_condition, window_request)
+            
+            # Inside a window, elements scrolled out of view (e.g. long browser pages) are skipped too
+            onscreen_condition = uia.CreatePropertyCondition(UIAutomationClient.UIA_IsOffscreenPropertyId, False)
+            
+            element_arrays = []
+            for w in range(windows.Length if windows else 0):
+                try:
+                    window = windows.GetElement(w)
+                    if cached_value(window, UIAutomationClient.UIA_IsOffscreenPropertyId, False):
+                        continue
+                    window_rect = window.CachedBoundingRectangle
+                    # Minimized windows sit at -32000
+                    if window_rect.right <= window_rect.left or window_rect.left < -10000 or window_rect.top < -10000:
+                        continue
+                    found = window.FindAllBuildCache(UIAutomationClient.TreeScope_Subtree, onscreen_condition, cache_request)
+                    if found:
+                        element_arrays.append(found)
+                except UIA_ERRORS:
+                    continue
+            
+            # Single walk over the arrays: fetch each element's rect, type and name once
+            # and collect Text elements for the nearby-text lookup as we go
+            snapshot = []
+            for all_elements in element_arrays:
                 for i in range(all_elements.Length):
                     try:
                         element = all_elements.GetElement(i)
-                        try:
-                            control_type = element.CurrentControlType
-                            if control_type == 50020:  # Text
-                                rect = element.CurrentBoundingRectangle
-                                name = element.CurrentName or ''
-                                if name:
-                                    key = f"{int(rect.left)}_{int(rect.top)}"
-                                    text_elements_map[key] = name
-                        except:
-                            pass
-                    except:
-                        pass
+                        rect = element.CachedBoundingRectangle
+                    except UIA_ERRORS:
+                        continue
+                    
+                    control_type = cached_value(element, UIAutomationClient.UIA_ControlTypePropertyId, 0)
+                    name = cached_value(element, UIAutomationClient.UIA_NamePropertyId)
+                    
+                    if control_type == 50020 and name:  # Text
+                        left, top = int(rect.left), int(rect.top)
+                        key = (left // NEARBY_TEXT_CELL_X, top // NEARBY_TEXT_CELL_Y)
+                        text_elements_map.setdefault(key, []).append((left, top, name))
+                    
+                    snapshot.append((element, rect, control_type, name))
             
-            # Second pass: process all elements with AGGRESSIVE name extraction
-            if all_elements:
-                for i in range(all_elements.Length):
+            # Resolve the extra property ids once per scan; ids missing from an older
+            # typelib are dropped here (their keys stay '')
+            property_ids = [(key, getattr(UIAutomationClient, property_name))
+                            for key, property_name in UIA_EXTRA_PROPERTIES
+                            if hasattr(UIAutomationClient, property_name)]
+            
+            # Process the snapshot with AGGRESSIVE name extraction
+            if snapshot:
+                # Sized for the worst case, trimmed to the rows actually kept
+                rows = [None] * len(snapshot)
+                count = 0
+                for element, rect, control_type, name in snapshot:
                     try:
-                        element = all_elements.GetElement(i)
-                        
                         # Get bounding rectangle
-                        rect = element.CurrentBoundingRectangle
                         width = rect.right - rect.left
                         height = rect.bottom - rect.top
                         
@@ -505,238 +898,56 @@ def get_all_ui_elements(uia, UIAutomationClient):
                         if rect.left < -10000 or rect.top < -10000:
                             continue
                         
-                        # Avoid duplicates
-                        element_id = f"{rect.left}_{rect.top}_{width}_{height}"
+                        # Avoid duplicates (box packed into one int: 16 bits per field)
+                        element_id = (((int(rect.left) & 0xFFFF) << 48) | ((int(rect.top) & 0xFFFF) << 32)
+                                      | ((int(width) & 0xFFFF) << 16) | (int(height) & 0xFFFF))
                         if element_id in processed:
                             continue
                         processed.add(element_id)
                         
-                        # Get control type
-                        control_type = 0
-                        try:
-                            control_type = element.CurrentControlType
-                        except:
-                            pass
-                        
-                        control_type_name = control_type_names.get(control_type, f"Type_{control_type}")
+                        type_name = control_type_name(control_type)
                         
                         # AGGRESSIVE NAME EXTRACTION
-                        name = ''
-                        
-                        # Method 1: CurrentName
-                        try:
-                            name = element.CurrentName or ''
-                        except:
-                            pass
+                        # Method 1: CurrentName (read during the walk above)
                         
-                        # Method 2: LegacyIAccessible pattern (often has names when CurrentName doesn't)
+                        # Methods 2-10, only those that can apply to this control type
                         if not name:
-                            try:
-                                legacy_pattern = element.GetCurrentPattern(UIAutomationClient.UIA_LegacyIAccessiblePatternId)
-                                if legacy_pattern:
-                                    legacy_name = legacy_pattern.CurrentName or ''
-                                    if legacy_name:
-                                        name = legacy_name
-                            except:
-                                pass
-                        
-                        # Method 3: Try Win32 API GetWindowText (only works for Window elements with handles)
-                        if not name:
-                            try:
-                                # Get native window handle
-                                hwnd = element.CurrentNativeWindowHandle
-                                if hwnd:
-                                    # Use Win32 API to get window text
-                                    length = GetWindowTextLengthW(hwnd)
-                                    if length > 0:
-                                        buff = ctypes.create_unicode_buffer(length + 1)
-                                        GetWindowTextW(hwnd, buff, length + 1)
-                                        name = buff.value or ''
-                            except:
-                                pass
-                        
-                        # Method 4: Value pattern
-                        if not name:
-                            try:
-                                value_pattern = element.GetCurrentPattern(UIAutomationClient.UIA_ValuePatternId)
-                                if value_pattern:
-                                    name = value_pattern.CurrentValue or ''
-                            except:
-                                pass
-                        
-                        # Method 5: Text pattern
-                        if not name:
-                            try:
-                                text_pattern = element.GetCurrentPattern(UIAutomationClient.UIA_TextPatternId)
-                                if text_pattern:
-                                    doc_range = text_pattern.DocumentRange
-                                    if doc_range:
-                                        name = doc_range.GetText(-1) or ''
-                            except:
-                                pass
-                        
-                        # Method 6: Child Text elements
-                        if not name:
-                            try:
-                                text_condition = uia.CreatePropertyCondition(
-                                    UIAutomationClient.UIA_ControlTypePropertyId,
-                                    UIAutomationClient.UIA_TextControlTypeId
-                                )
-                                child_texts = element.FindAll(UIAutomationClient.TreeScope_Children, text_condition)
-                                if child_texts and child_texts.Length > 0:
-                                    child_names = []
-                                    for j in range(min(child_texts.Length, 3)):
-                                        try:
-                                            child = child_texts.GetElement(j)
-                                            child_name = child.CurrentName or ''
-                                            if child_name:
-                                                child_names.append(child_name)
-                                        except:
-                                            pass
-                                    if child_names:
-                                        name = ' '.join(child_names)
-                            except:
-                                pass
-                        
-                        # Method 7: Nearby Text elements
-                        if not name:
-                            try:
-                                for dx in [0, 10, 20, 30, 40, 50, 60, 70]:
-                                    for dy in [0, -5, 5, -10, 10, -15, 15]:
-                                        key = f"{int(rect.left + dx)}_{int(rect.top + dy)}"
-                                        if key in text_elements_map:
-                                            name = text_elements_map[key]
-                                            break
-                                    if name:
-                                        break
-                            except:
-                                pass
-                        
-                        # Method 8: Parent element name (for elements inside named containers)
-                        if not name:
-                            try:
-                                walker = uia.ControlViewWalker
-                                parent = walker.GetParentElement(element)
-                                if parent:
-                                    parent_name = parent.CurrentName or ''
-                                    if parent_name and len(parent_name) < 100:  # Avoid huge parent names
-                                        # Only use parent name if this element has a specific type
-                                        if control_type in [50011, 50000, 50007]:  # MenuItem, Button, ListItem
-                                            name = f"{parent_name} item"
-                            except:
-                                pass
-                        
-                        # Method 9: Check for ToolTip pattern
-                        if not name:
-                            try:
-                                # Some elements have tooltips that contain their names
-                                tooltip = element.CurrentHelpText or ''
-                                if tooltip and len(tooltip) < 50:
-                                    name = tooltip
-                            except:
-                                pass
-                        
-                        # Method 10: Check sibling Image elements (icons often have names)
-                        if not name and control_type == 50011:  # MenuItem
-                            try:
-                                walker = uia.ControlViewWalker
-                                parent = walker.GetParentElement(element)
-                                if parent:
-                                    # Look for Image children with names
-                                    image_condition = uia.CreatePropertyCondition(
-                                        UIAutomationClient.UIA_ControlTypePropertyId,
-                                        UIAutomationClient.UIA_ImageControlTypeId
-                                    )
-                                    images = parent.FindAll(UIAutomationClient.TreeScope_Children, image_condition)
-                                    if images and images.Length > 0:
-                                        for k in range(images.Length):
-                                            try:
-                                                img = images.GetElement(k)
-                                                img_name = img.CurrentName or ''
-                                                if img_name:
-                                                    # Check if image is near this element
-                                                    img_rect = img.CurrentBoundingRectangle
-                                                    if abs(img_rect.top - rect.top) < 50:
-                                                        name = img_name
-                                                        break
-                                            except:
-                                                pass
-                            except:
-                                pass
-                        
-                        # Get other properties
-                        class_name = ''
-                        try:
-                            class_name = element.CurrentClassName or ''
-                        except:
-                            pass
-                        
-                        automation_id = ''
-                        try:
-                            automation_id = element.CurrentAutomationId or ''
-                        except:
-                            pass
-                        
-                        help_text = ''
-                        try:
-                            help_text = element.CurrentHelpText or ''
-                        except:
-                            pass
-                        
-                        full_description = ''
-                        try:
-                            full_description = element.CurrentFullDescription or ''
-                        except:
-                            pass
-                        
-                        accelerator_key = ''
-                        try:
-                            accelerator_key = element.CurrentAcceleratorKey or ''
-                        except:
-                            pass
-                        
-                        access_key = ''
-                        try:
-                            access_key = element.CurrentAccessKey or ''
-                        except:
-                            pass
+                            for name_method in NAME_METHODS.get(control_type, NAME_METHODS_DEFAULT):
+                                name = name_method(element, rect, control_type, uia, UIAutomationClient, text_elements_map)
+                                if name:
+                                    break
                         
-                        item_type = ''
-                        try:
-                            item_type = element.CurrentItemType or ''
-                        except:
-                            pass
+                        # Get other properties (prefetched by the cache request)
+                        props = {key: cached_value(element, property_id) for key, property_id in property_ids}
+                        class_name = props.get('class_name', '')
+                        automation_id = props.get('automation_id', '')
+                        help_text = props.get('help_text', '')
+                        full_description = props.get('full_description', '')
+                        accelerator_key = props.get('accelerator_key', '')
+                        access_key = props.get('access_key', '')
+                        item_type = props.get('item_type', '')
                         
                         # Build comprehensive name
                         display_name = name or help_text or full_description or item_type or ''
                         
-                        # Add element
-                        elements.append({
-                            'name': display_name,
-                            'original_name': name,
-                            'help_text': help_text,
-                            'full_description': full_description,
-                            'accelerator_key': accelerator_key,
-                            'access_key': access_key,
-                            'item_type': item_type,
-                            'control_type': control_type,
-                            'control_type_name': control_type_name,
-                            'class_name': class_name,
-                            'automation_id': automation_id,
-                            'x': int(rect.left),
-                            'y': int(rect.top),
-                            'width': int(width),
-                            'height': int(height),
-                            'center_x': int((rect.left + rect.right) // 2),
-                            'center_y': int((rect.top + rect.bottom) // 2)
-                        })
-                    except:
+                        # Add element (as a row; dicts are built in one pass below)
+                        rows[count] = (
+                            display_name, name, help_text, full_description, accelerator_key,
+                            access_key, item_type, control_type, type_name, class_name,
+                            automation_id, int(rect.left), int(rect.top), int(width), int(height),
+                            int((rect.left + rect.right) // 2), int((rect.top + rect.bottom) // 2)
+                        )
+                        count += 1
+                    except Exception:
                         continue
-        except:
+                
+                del rows[count:]
+                elements = [dict(zip(UI_ELEMENT_FIELDS, row)) for row in rows]
+        except Exception:
             pass
         
         return elements
-    except:
+    except Exception:
         return []
 
 def get_ui_elements():
@@ -757,23 +968,9 @@ def get_ui_elements():
                 by_type[control_type] = []
             by_type[control_type].append(elem)
         
-        # Control type names mapping
-        control_type_names = {
-            50000: "Button", 50001: "Calendar", 50002: "CheckBox", 50003: "ComboBox",
-            50004: "Edit", 50005: "Hyperlink", 50006: "Image", 50007: "ListItem",
-            50008: "List", 50009: "Menu", 50010: "MenuBar", 50011: "MenuItem",
-            50012: "ProgressBar", 50013: "RadioButton", 50014: "ScrollBar", 50015: "Slider",
-            50016: "Spinner", 50017: "StatusBar", 50018: "Tab", 50019: "TabItem",
-            50020: "Text", 50021: "ToolBar", 50022: "ToolTip", 50023: "Tree",
-            50024: "TreeItem", 50025: "Custom", 50026: "Group", 50027: "Thumb",
-            50028: "DataGrid", 50029: "DataItem", 50030: "Document", 50031: "SplitButton",
-            50032: "Window", 50033: "Pane", 50034: "Header", 50035: "HeaderItem",
-            50036: "Table", 50037: "TitleBar", 50038: "Separator"
-        }
-        
         summary = {}
         for control_type, items in by_type.items():
-            type_name = control_type_names.get(control_type, f"Type_{control_type}")
+            type_name = control_type_name(control_type)
             summary[type_name] = len(items)
         
         return {
@@ -782,75 +979,321 @@ def get_ui_elements():
             'elements': elements,
             'summary': summary
         }
-    except:
+    except Exception:
         return None
 
 # ============================================================================
 # OCR (embedded from ocr_detector.py)
 # ============================================================================
-def run_ocr(image_path):
-    """Run OCR on the screenshot"""
+# Longest image side fed to tesseract (larger screenshots are downscaled)
+OCR_MAX_SIDE = 1600.0
+
+# One tesserocr handle per process; the API is not reentrant, so calls hold TESS_LOCK
+TESS_API = None
+TESS_LOCK = threading.Lock()
+
+def get_tess_api():
+    """Create the tesserocr handle once and reuse it (None if unavailable)"""
+    global TESS_API, TESSEROCR_AVAILABLE
+    if TESS_API is None and TESSEROCR_AVAILABLE:
+        try:
+            # Same engine/page mode as OCR_CONFIG
+            if os.path.isdir(TESSDATA_DIR):
+                TESS_API = PyTessBaseAPI(path=TESSDATA_DIR, psm=PSM.AUTO, oem=OEM.LSTM_ONLY)
+            else:
+                TESS_API = PyTessBaseAPI(psm=PSM.AUTO, oem=OEM.LSTM_ONLY)
+            TESS_API.SetVariable('tessedit_do_invert', '0')
+        except Exception:
+            TESSEROCR_AVAILABLE = False
+    return TESS_API
+
+def tesserocr_image_to_data(api, gray):
+    """Word-level results in the same dict layout as pytesseract.image_to_data"""
+    data = {'text': [], 'conf': [], 'left': [], 'top': [], 'width': [], 'height': []}
+    # Raw 8-bit buffer - SetImage(PIL) would round-trip the image through an in-memory BMP
+    height, width = gray.shape
+    api.SetImageBytes(np.ascontiguousarray(gray).tobytes(), width, height, 1, width)
+    api.Recognize()
+    ri = api.GetIterator()
+    if ri is None:
+        return data
+    while True:
+        box = ri.BoundingBox(RIL.WORD)
+        if box is not None:
+            x1, y1, x2, y2 = box
+            data['text'].append(ri.GetUTF8Text(RIL.WORD) or '')
+            data['conf'].append(ri.Confidence(RIL.WORD))
+            data['left'].append(x1)
+            data['top'].append(y1)
+            data['width'].append(x2 - x1)
+            data['height'].append(y2 - y1)
+        if not ri.Next(RIL.WORD):
+            break
+    return data
+
+def warm_tess_api():
+    """Load the model and run one tiny recognition, so the first run_ocr finds a hot API"""
+    with TESS_LOCK:
+        api = get_tess_api()
+        if api is not None:
+            try:
+                api.SetImageBytes(b'\xff' * 100, 10, 10, 1, 10)
+                api.Recognize()
+            except Exception:
+                pass
+
+# Warm up while the screen is captured and the other scans start; run_ocr waits on TESS_LOCK
+if TESSERACT_AVAILABLE and TESSEROCR_AVAILABLE and '--no-ocr' not in sys.argv:
+    threading.Thread(target=warm_tess_api, daemon=True).start()
+
+# Column positions in tesseract's TSV output
+TSV_COLUMNS = {'left': 6, 'top': 7, 'width': 8, 'height': 9, 'conf': 10}
+
+def tesseract_tsv_to_data(tsv):
+    """image_to_data layout (as arrays) straight from the raw TSV, word rows with text only"""
+    rows = [fields for fields in (line.split('\t') for line in tsv.splitlines()[1:])
+            if len(fields) == 12 and fields[11].strip()]
+    columns = list(zip(*rows)) or [()] * 12
+    data = {key: np.array(columns[index], dtype=np.float32) for key, index in TSV_COLUMNS.items()}
+    data['text'] = list(columns[11])
+    return data
+
+# OCR results of recent frames, keyed by a hash of the image tesseract would see.
+# Kept in memory and mirrored to disk, since each tool run may be a fresh process.
+OCR_CACHE_SIZE = 32
+OCR_CACHE = OrderedDict()
+OCR_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'pantheon-ocr-cache')
+
+def ocr_cache_get(key):
+    """Cached run_ocr result for key, or None"""
+    result = OCR_CACHE.get(key)
+    if result is not None:
+        OCR_CACHE.move_to_end(key)
+        return result
+    path = os.path.join(OCR_CACHE_DIR, key + '.json')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+        os.utime(path)  # keep recently used entries from being evicted
+    except (OSError, ValueError):
+        return None
+    OCR_CACHE[key] = result
+    return result
+
+def ocr_cache_put(key, result):
+    """Store a run_ocr result, evicting the oldest entries past OCR_CACHE_SIZE"""
+    OCR_CACHE[key] = result
+    while len(OCR_CACHE) > OCR_CACHE_SIZE:
+        OCR_CACHE.popitem(last=False)
+    try:
+        os.makedirs(OCR_CACHE_DIR, exist_ok=True)
+        path = os.path.join(OCR_CACHE_DIR, key + '.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        os.replace(path + '.tmp', path)
+        
+        entries = sorted(os.scandir(OCR_CACHE_DIR), key=lambda e: e.stat().st_mtime)
+        for entry in entries[:-OCR_CACHE_SIZE]:
+            os.remove(entry.path)
+    except OSError:
+        pass
+
+def capture_to_gray(image):
+    """2-D uint8 grayscale array of an in-memory RGB capture"""
+    return cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2GRAY)
+
+def run_ocr(image_path, image=None, gray=None):
+    """Run OCR on the screenshot
+    
+    gray (from capture_to_gray) or image (the in-memory RGB capture) skip re-reading the PNG.
+    """
     if not TESSERACT_AVAILABLE:
         return None
     
     try:
-        image = cv2.imread(image_path)
-        if image is None:
-            return None
+        if gray is None and image is not None:
+            gray = capture_to_gray(image)
+        if gray is None:
+            gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                return None
         
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        custom_config = '--oem 3 --psm 3'
+        # Downscale large screenshots - OCR cost scales with pixel count
+        h, w = gray.shape
+        scale = min(1.0, OCR_MAX_SIDE / max(h, w))
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        # Binarize up front (Otsu), so tesseract gets ready-made black/white input
+        _, gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
         
-        data = pytesseract.image_to_data(
-            gray,
-            config=custom_config,
-            output_type=pytesseract.Output.DICT,
-            timeout=15
-        )
+        # Identical input gives identical tesseract output, so look the frame up first
+        digest = hashlib.blake2b(gray.tobytes(), digest_size=16)
+        digest.update(b'%dx%d' % (w, h))  # boxes are scaled back by the original size
+        cache_key = digest.hexdigest()
+        cached = ocr_cache_get(cache_key)
+        if cached is not None:
+            return cached
         
-        elements = []
-        n_boxes = len(data['text'])
-        for i in range(n_boxes):
-            try:
-                conf = float(data['conf'][i])
-                text = data['text'][i].strip()
-                
-                if conf < 30 or not text or len(text) < 1:
-                    continue
-                
-                x = data['left'][i]
-                y = data['top'][i]
-                w = data['width'][i]
-                h = data['height'][i]
-                
-                if w < 3 or h < 3:
-                    continue
-                
-                elements.append({
-                    'text': text,
-                    'confidence': conf / 100.0,
-                    'position': {'x': x, 'y': y},
-                    'size': {'width': w, 'height': h},
-                    'center': {'x': x + w // 2, 'y': y + h // 2}
-                })
-            except:
-                continue
+        custom_config = OCR_CONFIG
         
-        elements.sort(key=lambda e: (e['position']['y'], e['position']['x']))
+        with TESS_LOCK:
+            api = get_tess_api()
+            if api is not None:
+                data = tesserocr_image_to_data(api, gray)
+        if api is None:
+            data = tesseract_tsv_to_data(pytesseract.image_to_data(
+                gray,
+                config=custom_config,
+                output_type=pytesseract.Output.STRING,
+                timeout=15
+            ))
         
-        return {
+        # Filter and sort all boxes at once instead of per box
+        texts = [t.strip() if t else '' for t in data['text']]
+        conf = np.asarray(data['conf'], dtype=np.float32)
+        # Map back to full-resolution coordinates
+        left = (np.asarray(data['left'], dtype=np.float32) / scale).astype(np.int32)
+        top = (np.asarray(data['top'], dtype=np.float32) / scale).astype(np.int32)
+        width = (np.asarray(data['width'], dtype=np.float32) / scale).astype(np.int32)
+        height = (np.asarray(data['height'], dtype=np.float32) / scale).astype(np.int32)
+        
+        # Skip empty text, low confidence and very small boxes - one combined mask
+        nonempty = np.fromiter(map(bool, texts), dtype=bool, count=len(texts))
+        idx = np.flatnonzero(nonempty & (conf >= 30) & (width >= 3) & (height >= 3))
+        # Sort by position (top to bottom, left to right)
+        idx = idx[np.lexsort((left[idx], top[idx]))]
+        
+        elements = [{
+            'text': texts[i],
+            'confidence': c / 100.0,
+            'position': {'x': x, 'y': y},
+            'size': {'width': w, 'height': h},
+            'center': {'x': x + w // 2, 'y': y + h // 2}
+        } for i, c, x, y, w, h in zip(idx.tolist(), conf[idx].tolist(), left[idx].tolist(),
+                                      top[idx].tolist(), width[idx].tolist(), height[idx].tolist())]
+        
+        result = {
             'totalElements': len(elements),
             'detectedElements': len(elements),
             'textElements': elements,
             'truncated': False
         }
+        ocr_cache_put(cache_key, result)
+        return result
     except:
         return None
 
 # ============================================================================
 # MAIN SCREENSHOT FUNCTION
 # ============================================================================
-def take_screenshot(output_path=None, include_mouse=True, include_ocr=True, include_ui_elements=True):
+DXCAM_CAMERA = None
+
+def grab_dxcam():
+    """Primary output as an RGB ndarray via Desktop Duplication, or None"""
+    global DXCAM_CAMERA, DXCAM_AVAILABLE
+    try:
+        if DXCAM_CAMERA is None:
+            DXCAM_CAMERA = dxcam.create(output_idx=0, output_color='RGB')
+        # None when duplication has no frame to hand out (e.g. no display adapter)
+        return DXCAM_CAMERA.grab()
+    except Exception:
+        DXCAM_AVAILABLE = False
+        return None
+
+def grab_screen():
+    """Capture the primary monitor as a PIL image (dxcam, then mss, else ImageGrab)"""
+    if DXCAM_AVAILABLE:
+        frame = grab_dxcam()
+        if frame is not None:
+            return Image.fromarray(frame)
+    if MSS_AVAILABLE:
+        # The with-block releases mss's DCs and bitmap; the script ends in os._exit and a
+        # warm worker re-runs it, so a kept grabber would leak GDI handles every run
+        with mss.mss() as sct:
+            shot = sct.grab(sct.monitors[1])
+        # BGRA buffer -> RGB image without an intermediate copy
+        return Image.frombuffer('RGB', shot.size, shot.bgra, 'raw', 'BGRX', 0, 1)
+    return ImageGrab.grab()
+
+def save_image(image, path, image_format, **params):
+    """Write the image next to path, then move it into place (readers never see a partial file)"""
+    tmp_path = path + '.tmp'
+    try:
+        image.save(tmp_path, image_format, **params)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+# Result keys that repeat another key's data for the backend (screen_size = size, ...)
+RESULT_ALIASES = ('screen_size', 'mouse_position', 'ocr_text', 'ui_elements')
+
+# A previous analysis is only reused for the exact same pixels and window/focus state, and
+# only for a short while (e.g. a window changing behind others leaves the frame identical)
+FRAME_REUSE_TTL = 5.0
+# Last analysed frame: a small key file (key + options + time) and the full result next to it
+FRAME_STATE_KEY = os.path.join(tempfile.gettempdir(), 'pantheon-last-frame.key')
+FRAME_STATE_RESULT = os.path.join(tempfile.gettempdir(), 'pantheon-last-frame.json')
+
+def window_state():
+    """Foreground/focus/caret handles plus every app window's handle, title, rect and state"""
+    info = GUITHREADINFO(cbSize=ctypes.sizeof(GUITHREADINFO))
+    focus = ()
+    if GetGUIThreadInfo(0, byref(info)):
+        caret = info.rcCaret
+        focus = (info.hwndActive, info.hwndFocus, info.hwndCaret,
+                 caret.left, caret.top, caret.right, caret.bottom)
+    windows = tuple((w['hwnd'], w['text'], w['rect'].left, w['rect'].top, w['rect'].right,
+                     w['rect'].bottom, w['is_minimized'], w['is_maximized'])
+                    for w in enumerate_app_windows())
+    return (GetForegroundWindow(), focus, windows)
+
+def frame_key(image):
+    """Exact key of the captured pixels and the window/focus state, None if unavailable"""
+    try:
+        digest = hashlib.blake2b(image.tobytes(), digest_size=16)
+        digest.update(repr((image.size, window_state())).encode('utf-8'))
+        return digest.hexdigest()
+    except Exception:
+        return None
+
+def load_frame_result(key, options):
+    """Result of the last analysed frame if it is the same frame, same options, and recent"""
+    if key is None:
+        return None
+    try:
+        with open(FRAME_STATE_KEY, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state['key'] != key or state['options'] != options:
+            return None
+        if not 0 <= time.time() - state['time'] <= FRAME_REUSE_TTL:
+            return None
+        with open(FRAME_STATE_RESULT, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+        return result if result.get('success') else None
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def store_frame_result(key, options, result, captured_at):
+    """Remember this frame's analysis for load_frame_result (aged from the capture time)"""
+    if key is None:
+        return
+    try:
+        # Result first, so a key never points at an older result
+        with open(FRAME_STATE_RESULT + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        os.replace(FRAME_STATE_RESULT + '.tmp', FRAME_STATE_RESULT)
+        with open(FRAME_STATE_KEY + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'options': options, 'time': captured_at}, f)
+        os.replace(FRAME_STATE_KEY + '.tmp', FRAME_STATE_KEY)
+    except (OSError, TypeError, ValueError):
+        pass
+
+def take_screenshot(output_path=None, include_mouse=True, include_ocr=True, include_ui_elements=True,
+                    image_format='png'):
     """
     Take a screenshot with comprehensive analysis
     
@@ -859,6 +1302,7 @@ def take_screenshot(output_path=None, include_mouse=True, include_ocr=True, incl
         include_mouse: Whether to include mouse position
         include_ocr: Whether to include OCR text analysis
         include_ui_elements: Whether to include UI Automation elements
+        image_format: 'png' (lossless) or 'jpeg' (much faster encode, smaller file)
     
     Returns:
         dict: Result with all data
@@ -871,20 +1315,64 @@ def take_screenshot(output_path=None, include_mouse=True, include_ocr=True, incl
         }
     
     try:
+        jpeg = image_format.lower() in ('jpeg', 'jpg')
+        extension = '.jpg' if jpeg else '.png'
+        
         # Generate output path if not specified
         if output_path is None:
             os.makedirs(SCREENSHOT_DIR, exist_ok=True)
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            output_path = os.path.join(SCREENSHOT_DIR, f'screenshot_{timestamp}.png')
+            output_path = os.path.join(SCREENSHOT_DIR, f'screenshot_{timestamp}{extension}')
         else:
+            # Keep the extension in line with what is actually written
+            root, ext = os.path.splitext(output_path)
+            if ext.lower() in ('.png', '.jpg', '.jpeg') and (ext.lower() == '.png') == jpeg:
+                output_path = root + extension
             parent_dir = os.path.dirname(output_path)
             if parent_dir:
                 os.makedirs(parent_dir, exist_ok=True)
         
         # Take screenshot
-        screenshot = ImageGrab.grab()
-        screenshot.save(output_path, 'PNG')
-        abs_path = str(Path(output_path).resolve())
+        screenshot = grab_screen()
+        abs_path = os.path.abspath(output_path)
+        # OCR works from the capture in memory, the saved file is only for the caller
+        gray = capture_to_gray(screenshot) if include_ocr and TESSERACT_AVAILABLE else None
+        
+        # PNG encoding, OCR, UI Automation and the Windows API scan share no state and
+        # spend their time in C (zlib, tesseract, COM, USER32) - run them side by side
+        executor = ThreadPoolExecutor(max_workers=4)
+        if jpeg:
+            save_future = executor.submit(save_image, screenshot, abs_path, 'JPEG',
+                                          quality=JPEG_QUALITY, subsampling=1)
+        else:
+            # zlib level 1: ~3x faster encode for a few percent larger file
+            save_future = executor.submit(save_image, screenshot, abs_path, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
+        
+        # Screen and windows unchanged since a moment ago: reuse that analysis, only the new file is written
+        captured_at = time.time()
+        frame_hash = frame_key(screenshot)
+        frame_options = [include_ocr, include_ui_elements]
+        previous = load_frame_result(frame_hash, frame_options)
+        if previous is not None:
+            executor.shutdown(wait=False)
+            previous['path'] = abs_path
+            previous['message'] = f'Screenshot saved to {abs_path}'
+            if include_mouse:
+                mouse_pos = get_mouse_position()
+                previous['mousePosition'] = mouse_pos
+                previous['mouse_position'] = mouse_pos
+            else:
+                previous.pop('mousePosition', None)
+                previous.pop('mouse_position', None)
+            save_future.result()
+            return previous
+        
+        all_elements_future = executor.submit(get_all_screen_elements)
+        ocr_future = None
+        if include_ocr:
+            ocr_future = executor.submit(run_ocr, abs_path, gray=gray)
+        ui_elements_future = executor.submit(get_ui_elements) if include_ui_elements else None
+        executor.shutdown(wait=False)
         
         result = {
             'success': True,
@@ -901,37 +1389,35 @@ def take_screenshot(output_path=None, include_mouse=True, include_ocr=True, incl
             result['mouse_position'] = mouse_pos  # Backend expects this
         
         # Run OCR
-        if include_ocr:
-            ocr_data = run_ocr(abs_path)
+        if ocr_future is not None:
+            ocr_data = ocr_future.result()
             result['ocr'] = ocr_data
             # Backend expects ocr_text as array
             if ocr_data:
                 result['ocr_text'] = ocr_data.get('textElements', [])
         
         # Get UI elements
-        if include_ui_elements:
-            ui_elements_data = get_ui_elements()
+        if ui_elements_future is not None:
+            ui_elements_data = ui_elements_future.result()
             result['uiElements'] = ui_elements_data
             # Backend expects ui_elements as array
             if ui_elements_data and ui_elements_data.get('success'):
                 result['ui_elements'] = ui_elements_data.get('elements', [])
         
         # Get Windows API elements
-        all_elements_data = get_all_screen_elements()
+        all_elements_data = all_elements_future.result()
         if all_elements_data:
             result['windowsAPI'] = all_elements_data
             # Backend expects windowsAPI.elements array
             if all_elements_data.get('success'):
-                # Combine taskbar_icons and windows into elements array
-                elements = []
-                if all_elements_data.get('taskbar_icons'):
-                    for icon in all_elements_data['taskbar_icons']:
-                        icon['type'] = 'TaskbarButton'
-                        elements.append(icon)
-                if all_elements_data.get('windows'):
-                    elements.extend(all_elements_data['windows'])
+                # Combine taskbar_icons and windows into elements array (icons copied, not retyped in place)
+                elements = [{**icon, 'type': 'TaskbarButton'} for icon in all_elements_data.get('taskbar_icons') or ()]
+                elements.extend(all_elements_data.get('windows') or ())
                 result['windowsAPI']['elements'] = elements
         
+        # The saved file is part of the result - surface a failed save as before
+        save_future.result()
+        store_frame_result(frame_hash, frame_options, result, captured_at)
         return result
         
     except Exception as e:
@@ -951,18 +1437,23 @@ if __name__ == '__main__':
     parser.add_argument('--no-mouse', action='store_true', help='Skip mouse position')
     parser.add_argument('--no-ocr', action='store_true', help='Skip OCR')
     parser.add_argument('--no-ui', action='store_true', help='Skip UI elements')
+    parser.add_argument('--format', default='png', choices=['png', 'jpeg'], help='Image format to save')
     
     args = parser.parse_args()
     result = take_screenshot(
         args.output,
         include_mouse=not args.no_mouse,
         include_ocr=not args.no_ocr,
-        include_ui_elements=not args.no_ui
+        include_ui_elements=not args.no_ui,
+        image_format=args.format
     )
     
     if args.json:
-        json_output = json.dumps(result, indent=2)
-        print(json_output)
+        if os.environ.get('PANTHEON_COMPACT_JSON') == '1':
+            # Callers that read the canonical keys only - don't serialize the backend aliases twice
+            for alias in RESULT_ALIASES:
+                result.pop(alias, None)
+        print_json(result)
         sys.stdout.flush()
     else:
         print(result['message'])
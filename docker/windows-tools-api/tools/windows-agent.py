@@ -16,6 +16,7 @@ import base64
 import io
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import tempfile
+import shutil
 
 # Windows-specific flag to hide console windows
 CREATE_NO_WINDOW = 0x08000000
@@ -84,9 +85,12 @@ class AgentHandler(BaseHTTPRequestHandler):
         """Decrypt and execute encrypted script from API service"""
         try:
             # Extract encryption details
-            encrypted_data = bytes.fromhex(payload.get('encryptedScript') or payload.get('encryptedCommand'))
-            iv = bytes.fromhex(payload['iv'])
-            auth_tag = bytes.fromhex(payload['authTag'])
+            # Binary fields are base64 when the payload says so, hex for older services
+            encoding = payload.get('encoding', 'hex')
+            decode = base64.b64decode if encoding == 'base64' else bytes.fromhex
+            encrypted_data = decode(payload.get('encryptedScript') or payload.get('encryptedCommand'))
+            iv = decode(payload['iv'])
+            auth_tag = decode(payload['authTag'])
             key = bytes.fromhex(payload['decryption']['key'])
             script_type = payload.get('type', 'python')
             arguments = payload.get('arguments', [])
@@ -151,12 +155,24 @@ class AgentHandler(BaseHTTPRequestHandler):
                 
                 script_content = '\n'.join(fixed_lines)
                 
-                # Create temporary file
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8', newline='\n') as f:
-                    f.write(script_content)
-                    temp_file = f.name
-                
+                # Create temporary directory, bundled helper scripts sit next to the main script so it can import them
+                temp_dir = tempfile.mkdtemp()
                 try:
+                    for helper in payload.get('helperScripts', []):
+                        helper_content = aesgcm.decrypt(
+                            decode(helper['iv']),
+                            decode(helper['encryptedContent']) + decode(helper['authTag']),
+                            None
+                        )
+                        # Names come from the payload - keep every file inside temp_dir
+                        with open(os.path.join(temp_dir, os.path.basename(helper['name'])), 'wb') as f:
+                            f.write(helper_content)
+                    
+                    script_file = os.path.basename(script_name)
+                    temp_file = os.path.join(temp_dir, script_file if script_file.endswith('.py') else 'script.py')
+                    with open(temp_file, 'w', encoding='utf-8', newline='\n') as f:
+                        f.write(script_content)
+                    
                     # Execute the script
                     args_str = [str(arg) for arg in arguments]
                     cmd = ['python', temp_file] + args_str
@@ -197,9 +213,8 @@ class AgentHandler(BaseHTTPRequestHandler):
                             'output': result.stdout.strip()
                         }
                 finally:
-                    # Clean up temp file
-                    if os.path.exists(temp_file):
-                        os.unlink(temp_file)
+                    # Clean up temp files
+                    shutil.rmtree(temp_dir, ignore_errors=True)
                         
         except Exception as e:
             print(f'[ERROR] Decryption/execution failed: {str(e)}')
@@ -428,7 +443,9 @@ class AgentHandler(BaseHTTPRequestHandler):
                 'agent': 'Windows Agent (Pure API Service Mode)',
                 'version': '6.0.0',
                 'mode': 'pure_api_service',
-                'local_generation': False
+                'local_generation': False,
+                # Encrypted payload field encodings this agent decodes, callers pass them on to the API
+                'encodings': ['hex', 'base64']
             }).encode())
         else:
             self.send_response(404)